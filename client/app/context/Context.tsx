@@ -17,10 +17,12 @@ import {
   CreateTransactionPayload,
   CreateCategoryPayload,
   DefaultCategory,
+  TransactionSummary,
 } from "../interfaces/api_interfaces";
 
 import {
   getTransactions, // Renombrado
+  getTransactionSummary,
   createTransaction as apiCreateTransaction, // Renombrado y aliased
   updateTransaction as apiUpdateTransaction, // Added update function
   deleteTransaction as apiDeleteTransaction, // Renombrado y aliased
@@ -52,6 +54,11 @@ const ExpenseProvider: React.FC<ExpenseProviderProps> = ({ children }) => {
   const [isAuth, setIsAuth] = useState<boolean>(false);
 
   const [transactions, setTransactions] = useState<Transaction[]>([]);
+  // `next` link of the last loaded page, null once the last page is loaded
+  const [nextTransactionsPage, setNextTransactionsPage] = useState<
+    string | null
+  >(null);
+  const [summary, setSummary] = useState<TransactionSummary | null>(null);
   const [categories, setCategories] = useState<Category[]>([]);
   const [defaultCategories, setDefaultCategories] = useState<DefaultCategory[]>(
     []
@@ -121,13 +128,44 @@ const ExpenseProvider: React.FC<ExpenseProviderProps> = ({ children }) => {
   const fetchTransactions = useCallback(async () => {
     startLoading();
     try {
-      const transactions = await getTransactions(filters);
-      setTransactions(transactions);
+      const page = await getTransactions(filters);
+      setTransactions(page.results);
+      setNextTransactionsPage(page.next);
     } finally {
       stopLoading();
     }
   }, [filters, startLoading, stopLoading]);
 
+  const loadMoreTransactions = useCallback(async () => {
+    if (!nextTransactionsPage) return;
+    startLoading();
+    try {
+      const page = await getTransactions(filters, nextTransactionsPage);
+      // Rows created meanwhile may already be in the list
+      setTransactions((prev) => {
+        const loaded = new Set(prev.map((transaction) => transaction.id));
+        return [
+          ...prev,
+          ...page.results.filter((transaction) => !loaded.has(transaction.id)),
+        ];
+      });
+      setNextTransactionsPage(page.next);
+    } catch (error) {
+      console.error("Failed to load more transactions:", error);
+    } finally {
+      stopLoading();
+    }
+  }, [filters, nextTransactionsPage, startLoading, stopLoading]);
+
+  // Totals are computed by the server, refetch them after every mutation
+  const fetchSummary = useCallback(async () => {
+    try {
+      setSummary(await getTransactionSummary(filters));
+    } catch (error) {
+      console.error("Failed to fetch transaction summary:", error);
+    }
+  }, [filters]);
+
   const createTransaction = useCallback(
     async (newTransaction: CreateTransactionPayload): Promise<void> => {
       startLoading();
@@ -135,6 +173,7 @@ const ExpenseProvider: React.FC<ExpenseProviderProps> = ({ children }) => {
         const custom_response = await apiCreateTransaction(newTransaction);
         if (custom_response.success) {
           setTransactions((prev) => [...prev, custom_response.data]);
+          fetchSummary();
           showMessage(
             "success",
             "Transaction Recorded",
@@ -153,7 +192,7 @@ const ExpenseProvider: React.FC<ExpenseProviderProps> = ({ children }) => {
         stopLoading();
       }
     },
-    [startLoading, stopLoading]
+    [startLoading, stopLoading, fetchSummary]
   );
 
   const updateTransaction = useCallback(
@@ -173,6 +212,7 @@ const ExpenseProvider: React.FC<ExpenseProviderProps> = ({ children }) => {
               transaction.id === id ? custom_response.data : transaction
             )
           );
+          fetchSummary();
         } else {
           const error_details = custom_response.error_details;
           let fieldError = Object.keys(error_details)[0];
@@ -187,7 +227,7 @@ const ExpenseProvider: React.FC<ExpenseProviderProps> = ({ children }) => {
         stopLoading();
       }
     },
-    [startLoading, stopLoading]
+    [startLoading, stopLoading, fetchSummary]
   );
 
   const deleteTransaction = useCallback(async (id: number) => {
@@ -195,6 +235,7 @@ const ExpenseProvider: React.FC<ExpenseProviderProps> = ({ children }) => {
     try {
       await apiDeleteTransaction(id);
       setTransactions((prev) => prev.filter((exp) => exp.id !== id));
+      fetchSummary();
       showMessage(
         "success",
         "Transaction Deleted",
@@ -205,7 +246,7 @@ const ExpenseProvider: React.FC<ExpenseProviderProps> = ({ children }) => {
     } finally {
       stopLoading();
     }
-  }, [startLoading, stopLoading]);
+  }, [startLoading, stopLoading, fetchSummary]);
 
   // --- Funciones API para Categorías ---
   const fetchCategories = useCallback(async () => {
@@ -282,8 +323,9 @@ const ExpenseProvider: React.FC<ExpenseProviderProps> = ({ children }) => {
   useEffect(() => {
     if (isAuth) {
       fetchTransactions();
+      fetchSummary();
     }
-  }, [filters, isAuth, fetchTransactions]);
+  }, [filters, isAuth, fetchTransactions, fetchSummary]);
 
   useEffect(() => {
     fetchDefaultCategories();
@@ -298,6 +340,9 @@ const ExpenseProvider: React.FC<ExpenseProviderProps> = ({ children }) => {
         setPassword,
         showMessage,
         transactions, // Estado `transactions` para transacciones
+        hasMoreTransactions: nextTransactionsPage !== null,
+        loadMoreTransactions,
+        summary,
         categories,
         createTransaction,
         updateTransaction,
@@ -34,6 +34,43 @@ export interface Transaction {
   amount: string; 
   notes: string;
   created_at: string;
+  category?: EmbeddedCategory | null; // Only present with ?expand=category
+}
+
+export interface EmbeddedCategory {
+  id: number;
+  name: string;
+  is_expense: boolean;
+  icon: string;
+  color: string;
+}
+
+export interface TransactionSummary {
+  total_income: string;
+  total_expenses: string;
+  net_balance: string;
+  income_count: number;
+  expense_count: number;
+}
+
+export interface TimeseriesSeries {
+  category_type_model: "category" | "defaultcategory" | null;
+  category_id: number | null;
+  is_expense: boolean;
+  totals: string[]; // One entry per bucket
+  counts: number[];
+}
+
+export interface TransactionTimeseries {
+  interval: "day" | "week" | "month";
+  buckets: string[]; // First day of each bucket, YYYY-MM-DD
+  series: TimeseriesSeries[];
+}
+
+export interface PaginatedResponse<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
 }
 
 
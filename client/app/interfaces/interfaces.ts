@@ -4,6 +4,7 @@ import {
   CreateTransactionPayload,
   CreateCategoryPayload,
   DefaultCategory,
+  TransactionSummary,
   CategoryTypeModel,
   TransactionType,
 } from "./api_interfaces";
@@ -17,6 +18,8 @@ export interface ExpenseContextProps {
 
   // Estados para los datos
   transactions: Transaction[];
+  hasMoreTransactions: boolean;
+  summary: TransactionSummary | null;
   categories: Category[];
 
   // Loading state
@@ -41,6 +44,7 @@ export interface ExpenseContextProps {
     updatedTransaction: CreateTransactionPayload
   ) => Promise<void>;
   deleteTransaction: (id: number) => Promise<void>;
+  loadMoreTransactions: () => Promise<void>;
 
   // Funciones API para Categorías
   createCategory: (
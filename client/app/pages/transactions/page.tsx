@@ -24,8 +24,16 @@ import {
 } from "lucide-react";
 
 const TransactionsPage: React.FC = () => {
-  const { transactions, categories, defaultCategories, setFilters, filters } =
-    useExpenseContext();
+  const {
+    transactions,
+    hasMoreTransactions,
+    loadMoreTransactions,
+    summary,
+    categories,
+    defaultCategories,
+    setFilters,
+    filters,
+  } = useExpenseContext();
 
   const [showManageCategoriesModal, setShowManageCategoriesModal] =
     useState(false);
@@ -71,15 +79,9 @@ const TransactionsPage: React.FC = () => {
   };
 
   // Calcular estadísticas
-  const totalIncome = transactions
-    .filter((t) => !t.is_expense)
-    .reduce((sum, t) => sum + Number.parseFloat(t.amount), 0);
-
-  const totalExpenses = transactions
-    .filter((t) => t.is_expense)
-    .reduce((sum, t) => sum + Number.parseFloat(t.amount), 0);
-
-  const netBalance = totalIncome - totalExpenses;
+  const totalIncome = Number.parseFloat(summary?.total_income ?? "0");
+  const totalExpenses = Number.parseFloat(summary?.total_expenses ?? "0");
+  const netBalance = Number.parseFloat(summary?.net_balance ?? "0");
 
   // Manejadores para los filtros
   const handleTransactionTypeChange = (
@@ -329,7 +331,8 @@ const TransactionsPage: React.FC = () => {
                   </div>
                 </div>
                 <span className="text-xs text-neutral-600 dark:text-neutral-400 self-center whitespace-nowrap">
-                  {transactions.length} items
+                  {transactions.length}
+                  {hasMoreTransactions ? "+" : ""} items
                 </span>
               </div>
             </div>
@@ -433,6 +436,16 @@ const TransactionsPage: React.FC = () => {
                   </tbody>
                 </table>
               </div>
+              {hasMoreTransactions && (
+                <div className="p-4 border-t border-border-primary">
+                  <button
+                    onClick={loadMoreTransactions}
+                    className="w-full px-4 py-3 rounded-button font-medium text-neutral-700 dark:text-neutral-200 bg-surface-secondary hover:bg-surface-primary border border-border-primary transition-all duration-200"
+                  >
+                    Load more
+                  </button>
+                </div>
+              )}
             </div>
           )}
         </div>
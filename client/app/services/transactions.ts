@@ -3,15 +3,15 @@ import axios from "axios";
 import {
   CreateTransactionPayload,
   CustomTransacctionResponse,
+  PaginatedResponse,
   Transaction,
+  TransactionSummary,
+  TransactionTimeseries,
 } from "../interfaces/api_interfaces";
 import { FiltersInterface } from "../interfaces/interfaces";
 import api from "./api";
 
-export const getTransactions = async (
-  filters: FiltersInterface
-): Promise<Transaction[]> => {
-  let url = "transactions/";
+const buildTransactionQuery = (filters: FiltersInterface): string => {
   const queryParams = [];
 
   if (filters.transactionType !== "all") {
@@ -31,19 +31,58 @@ export const getTransactions = async (
     queryParams.push(`category_type_model=${filters.categoryTypeModel}`);
   }
 
-  if (queryParams.length > 0) {
-    url += `?${queryParams.join("&")}`;
-  }
+  return queryParams.length > 0 ? `?${queryParams.join("&")}` : "";
+};
+
+export const getTransactions = async (
+  filters: FiltersInterface,
+  cursor: string | null = null
+): Promise<PaginatedResponse<Transaction>> => {
+  // The list is cursor-paginated: fetch the first page, or the page at
+  // `cursor` (the `next` link of the previous one) when loading more
+  const url = cursor ?? "transactions/" + buildTransactionQuery(filters);
   try {
-    const response = await api.get(url);
+    const response = await api.get<PaginatedResponse<Transaction>>(url);
     return response.data;
-    
   } catch (error) {
     console.error("Error fetching transactions:", error);
     throw error;
   }
 };
 
+export const getTransactionSummary = async (
+  filters: FiltersInterface
+): Promise<TransactionSummary> => {
+  try {
+    const response = await api.get<TransactionSummary>(
+      "transactions/summary/" + buildTransactionQuery(filters)
+    );
+    return response.data;
+  } catch (error) {
+    console.error("Error fetching transaction summary:", error);
+    throw error;
+  }
+};
+
+export const getTransactionTimeseries = async (
+  interval: "day" | "week" | "month",
+  from?: string,
+  to?: string
+): Promise<TransactionTimeseries> => {
+  const queryParams = [`interval=${interval}`];
+  if (from) queryParams.push(`from=${from}`);
+  if (to) queryParams.push(`to=${to}`);
+  try {
+    const response = await api.get<TransactionTimeseries>(
+      `transactions/timeseries/?${queryParams.join("&")}`
+    );
+    return response.data;
+  } catch (error) {
+    console.error("Error fetching transaction timeseries:", error);
+    throw error;
+  }
+};
+
 export const createTransaction = async (
   transaction: CreateTransactionPayload
 ): Promise<CustomTransacctionResponse> => {
@@ -0,0 +1,70 @@
+"""
+Authentication helpers.
+
+`find_user()` resolves a login identifier (username or email, in any case)
+with a single query over the `lower()` indexes created by migration 0009.
+`CachedJWTAuthentication` keeps the users of recent JWT requests in the cache
+for `AUTH_USER_CACHE_TIMEOUT` seconds, so authenticated requests stop running
+one user query each. Any change to a user drops its entry (see
+`api.signals`).
+"""
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Case, Q, When
+from django.db.models.functions import Lower
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+DEFAULT_USER_CACHE_TIMEOUT = 60
+
+
+def find_user(identifier):
+    """
+    Returns the user whose email or username is `identifier`, ignoring
+    case, or None. An email match wins over a username match.
+    """
+    identifier = identifier.lower()
+    return (
+        User.objects.alias(email_lower=Lower('email'), username_lower=Lower('username'))
+        .filter(Q(email_lower=identifier) | Q(username_lower=identifier))
+        .order_by(Case(When(email_lower=identifier, then=0), default=1), 'pk')
+        .first()
+    )
+
+
+def auth_user_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+def invalidate_auth_user(user_id):
+    cache.delete(auth_user_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    `JWTAuthentication` that reads the user from the cache when it can.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = cache.get(auth_user_key(user_id)) if user_id is not None else None
+        if user is None:
+            user = super().get_user(validated_token)
+            timeout = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', DEFAULT_USER_CACHE_TIMEOUT)
+            if timeout:
+                cache.set(auth_user_key(user_id), user, timeout=timeout)
+            return user
+
+        # The same checks as JWTAuthentication.get_user(), on the cached user
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
@@ -0,0 +1,194 @@
+"""
+Benchmarks for the API hot paths.
+
+`generate_dataset()` fills the database with synthetic users, categories and
+transactions, and `run_benchmarks()` times the main endpoints through the DRF
+test client, recording latency percentiles, queries per request and peak
+memory. Used by the `benchmark` management command, which runs everything
+inside a transaction that is rolled back at the end. Throttle buckets live
+outside that transaction, so throttling is off while the scenarios run.
+"""
+
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import rollups
+from .category_tree import invalidate_category_tree
+from .models import Category, ChangeCounter, Transaction
+
+
+PASSWORD = 'benchmark-password'
+
+NOTES = ['coffee', 'groceries', 'rent', 'salary', 'taxi', 'lunch', 'books', 'gym', 'cinema', 'gift']
+
+
+def generate_dataset(users=10, transactions=1000, categories=10, seed=0, batch_size=1000):
+    """
+    Creates `users` users, each with `categories` categories (half of them
+    subcategories) and `transactions` transactions spread over the last
+    year. Returns the created users.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    # Hashing once keeps generation fast; logins still pay for the real check
+    password = make_password(PASSWORD)
+
+    created_users = User.objects.bulk_create([
+        User(username=f'bench-user-{i}', email=f'bench-user-{i}@example.com', password=password)
+        for i in range(users)
+    ])
+    for user in created_users:
+        roots = [
+            Category(user=user, name=f'Category {i}', is_expense=i % 4 != 0)
+            for i in range((categories + 1) // 2)
+        ]
+        ChangeCounter.stamp(roots)
+        roots = Category.objects.bulk_create(roots)
+        children = [
+            Category(user=user, name=f'Subcategory {i}', is_expense=roots[i % len(roots)].is_expense,
+                     parent_category=roots[i % len(roots)])
+            for i in range(categories // 2)
+        ]
+        ChangeCounter.stamp(children)
+        children = Category.objects.bulk_create(children)
+        user_categories = roots + children
+        invalidate_category_tree(user.id)
+
+        for start in range(0, transactions, batch_size):
+            batch = []
+            for _ in range(min(batch_size, transactions - start)):
+                category = rng.choice(user_categories)
+                batch.append(Transaction(
+                    user=user,
+                    user_category=category,
+                    amount=Decimal(rng.randint(100, 50000)) / 100,
+                    is_expense=category.is_expense,
+                    notes=' '.join(rng.sample(NOTES, 2)),
+                    created_at=now - timedelta(minutes=rng.randint(0, 365 * 24 * 60)),
+                ))
+            ChangeCounter.stamp(batch)
+            rollups.record_bulk_create(Transaction.objects.bulk_create(batch))
+    return created_users
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(request, iterations=50, warmup=3):
+    """
+    Calls `request()` (which returns a response) `iterations` times and
+    returns its latency percentiles in milliseconds, the queries run by one
+    call and its peak traced memory. Memory is traced in a separate call so
+    that tracing does not slow down the timed ones.
+    """
+    for _ in range(warmup):
+        request()
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = request()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    with CaptureQueriesContext(connection) as queries:
+        request()
+
+    tracemalloc.start()
+    try:
+        request()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'status': response.status_code,
+        'iterations': iterations,
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'queries': len(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(user, iterations=50, scenarios=None):
+    """
+    Times every scenario (or the ones named in `scenarios`) as `user` and
+    returns their results by name.
+    """
+    # Not 'testserver', which is only allowed while tests run
+    client = APIClient(SERVER_NAME='localhost')
+    client.force_authenticate(user=user)
+    anonymous = APIClient(SERVER_NAME='localhost')
+
+    category = Category.objects.filter(user=user, parent_category__isnull=True).first()
+    transaction = Transaction.objects.filter(user=user).order_by('-id').first()
+    list_url = reverse('transaction-list')
+    year = timezone.localdate().year
+
+    def create():
+        return client.post(reverse('transaction-create'), {
+            'category_type_model': 'category',
+            'category_id': category.id,
+            'amount': '12.34',
+            'is_expense': category.is_expense,
+            'notes': 'benchmark',
+        }, format='json')
+
+    available = {
+        'transaction_list': lambda: client.get(list_url),
+        'transaction_list_filtered': lambda: client.get(
+            list_url, {'is_expense': 'true', 'date': str(year), 'category_type_model': 'category',
+                       'category_id': category.id, 'include_subcategories': 'true'}),
+        'transaction_create': create,
+        'transaction_detail': lambda: client.get(reverse('transaction-detail', kwargs={'pk': transaction.id})),
+        'category_list': lambda: client.get(reverse('category-list-create')),
+        'login': lambda: anonymous.post(
+            reverse('login'), {'identifier': user.username, 'password': PASSWORD}, format='json'),
+    }
+
+    results = {}
+    # Buckets that are never stored: repeated runs must time logins, not 429s
+    no_throttling = {**settings.CACHES, 'throttle': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    with override_settings(CACHES=no_throttling):
+        for name, request in available.items():
+            if scenarios and name not in scenarios:
+                continue
+            # Logins are dominated by password hashing, a few are enough
+            results[name] = measure(request, iterations=min(iterations, 5) if name == 'login' else iterations)
+    return results
+
+
+def compare(results, baseline, threshold=0.1):
+    """
+    Returns `(name, metric, before, after)` for every p50/p95 latency or query
+    count in `results` that is more than `threshold` worse than in `baseline`.
+    """
+    regressions = []
+    for name, current in results.get('scenarios', {}).items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        for metric in ('p50_ms', 'p95_ms', 'queries'):
+            before, after = previous.get(metric), current.get(metric)
+            if before is None or after is None:
+                continue
+            if after > before * (1 + threshold) and after - before > (0 if metric == 'queries' else 0.5):
+                regressions.append((name, metric, before, after))
+    return regressions
@@ -0,0 +1,67 @@
+"""
+Versioned cache entries.
+
+Cached data is stored under a key that includes a version number. Invalidating
+only bumps the version, so stale entries are never read again and simply
+expire, and every worker sharing the cache backend sees the change at once.
+"""
+
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.http import parse_etags
+
+
+DEFAULT_CATEGORIES = 'default-categories'
+
+
+def get_version(namespace):
+    version = cache.get(f'{namespace}:version')
+    if version is None:
+        # Versions start from the clock, so a version evicted from the cache
+        # is never handed out again for different data
+        initial = time.time_ns()
+        cache.add(f'{namespace}:version', initial, timeout=None)
+        version = cache.get(f'{namespace}:version', initial)
+    return version
+
+
+def bump_version(namespace):
+    """
+    Invalidates everything cached under `namespace`.
+    """
+    try:
+        cache.incr(f'{namespace}:version')
+    except ValueError:
+        # No version stored yet (or it was evicted)
+        cache.set(f'{namespace}:version', time.time_ns(), timeout=None)
+
+
+def make_etag(data):
+    payload = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True).encode()
+    return '"%s"' % hashlib.md5(payload, usedforsecurity=False).hexdigest()
+
+
+def get_or_build(namespace, build, timeout=None):
+    """
+    Returns `(data, etag)` for the current version of `namespace`, calling
+    `build()` to produce the data on a cache miss.
+    """
+    key = f'{namespace}:v{get_version(namespace)}'
+    entry = cache.get(key)
+    if entry is None:
+        data = build()
+        entry = {'data': data, 'etag': make_etag(data)}
+        cache.set(key, entry, timeout=timeout)
+    return entry['data'], entry['etag']
+
+
+def etag_matches(request, etag):
+    if_none_match = request.headers.get('If-None-Match')
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return '*' in etags or etag in etags or etag in [e.removeprefix('W/') for e in etags]
@@ -0,0 +1,171 @@
+"""
+Per-user category hierarchy.
+
+A user's categories are loaded with one query into a `CategoryTree`, which
+precomputes every node's ancestors and depth, so ancestry checks are set
+lookups instead of one query per level. Trees are cached per user and
+invalidated by version bump whenever one of the user's categories changes
+(see `api.signals`). With the per-process locmem backend only the worker that
+handled the change sees the bump, so trees also expire after `MAX_AGE`
+seconds. Cached trees therefore only serve reads; `validate_parent()` checks
+writes against the database.
+
+Aggregates over a subtree use `subtree_sql()` instead, a recursive CTE that
+resolves the subtree inside the same database query.
+"""
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .caching import bump_version, get_or_build
+
+
+MAX_DEPTH = 5
+MAX_AGE = 60
+
+
+def tree_namespace(user_id):
+    return f'category-tree:{user_id}'
+
+
+class CategoryTree:
+
+    def __init__(self, rows):
+        """
+        `rows` is an iterable of `(id, parent_id, name)` tuples.
+        """
+        self.parents = {}
+        self.names = {}
+        self.children = {}
+        for category_id, parent_id, name in rows:
+            self.parents[category_id] = parent_id
+            self.names[category_id] = name
+            self.children.setdefault(parent_id, []).append(category_id)
+
+        self._ancestors = {}
+        for category_id in self.parents:
+            self._ancestors[category_id] = self._walk_up(category_id)
+
+    def _walk_up(self, category_id):
+        chain, seen = [], {category_id}
+        parent = self.parents.get(category_id)
+        while parent is not None and parent in self.parents and parent not in seen:
+            chain.append(parent)
+            seen.add(parent)
+            parent = self.parents.get(parent)
+        return tuple(chain)
+
+    def __contains__(self, category_id):
+        return category_id in self.parents
+
+    def name(self, category_id):
+        return self.names.get(category_id)
+
+    def ancestors(self, category_id):
+        """
+        Returns the ancestors of `category_id`, closest first.
+        """
+        return self._ancestors.get(category_id, ())
+
+    def depth(self, category_id):
+        """
+        Number of ancestors of `category_id`; a root category has depth 0.
+        """
+        return len(self.ancestors(category_id))
+
+    def is_ancestor(self, ancestor_id, category_id):
+        return ancestor_id in self._ancestors.get(category_id, ())
+
+    def descendants(self, category_id):
+        """
+        Returns every category below `category_id`, in breadth-first order.
+        """
+        found, queue, seen = [], list(self.children.get(category_id, ())), {category_id}
+        while queue:
+            child = queue.pop(0)
+            if child in seen:
+                continue
+            seen.add(child)
+            found.append(child)
+            queue.extend(self.children.get(child, ()))
+        return found
+
+    def subtree_ids(self, category_id):
+        return [category_id] + self.descendants(category_id)
+
+
+def get_category_tree(user_id, containing=None):
+    """
+    Returns the user's cached `CategoryTree`. If `containing` is given and
+    missing from it, the tree may predate the category, so it is rebuilt.
+    """
+    from .models import Category
+
+    def build():
+        return list(Category.objects.filter(user_id=user_id).values_list('id', 'parent_category_id', 'name'))
+
+    rows, _ = get_or_build(tree_namespace(user_id), build, timeout=MAX_AGE)
+    tree = CategoryTree(rows)
+    if containing is not None and containing not in tree:
+        invalidate_category_tree(user_id)
+        rows, _ = get_or_build(tree_namespace(user_id), build, timeout=MAX_AGE)
+        tree = CategoryTree(rows)
+    return tree
+
+
+def invalidate_category_tree(user_id):
+    bump_version(tree_namespace(user_id))
+
+
+def validate_parent(category_id, parent_id):
+    """
+    Returns an error message if `parent_id` cannot be the parent of
+    `category_id`, or None. The parent's ancestors are read from the
+    database with a recursive CTE, never from a cached tree, so a stale tree
+    cannot let a cycle in. Recursion stops after `MAX_DEPTH` levels.
+    """
+    if parent_id == category_id and category_id is not None:
+        return 'A category cannot be its own parent.'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            WITH RECURSIVE chain(id, parent_id, depth) AS (
+                SELECT id, parent_category_id, 0 FROM api_category WHERE id = %s
+                UNION ALL
+                SELECT parent.id, parent.parent_category_id, chain.depth + 1 FROM api_category parent
+                JOIN chain ON parent.id = chain.parent_id
+                WHERE chain.depth < %s
+            )
+            SELECT id FROM chain ORDER BY depth
+            """,
+            [parent_id, MAX_DEPTH],
+        )
+        # The parent and its ancestors, closest first
+        chain = [row[0] for row in cursor.fetchall()]
+    if category_id is not None and category_id in chain[:MAX_DEPTH]:
+        return 'Circular reference detected in category hierarchy.'
+    if len(chain) >= MAX_DEPTH:
+        return f'Category hierarchy is too deep (max {MAX_DEPTH} levels).'
+    return None
+
+
+def subtree_sql(user_id, category_id):
+    """
+    Subquery selecting the ids of `category_id` and all its subcategories
+    with a recursive CTE, so the subtree is resolved inside the database
+    query that uses it. Recursion stops after `MAX_DEPTH` levels, which
+    also guards against cycles.
+    """
+    return RawSQL(
+        """
+        WITH RECURSIVE subtree(id, depth) AS (
+            SELECT id, 0 FROM api_category WHERE id = %s AND user_id = %s
+            UNION ALL
+            SELECT child.id, subtree.depth + 1 FROM api_category child
+            JOIN subtree ON child.parent_category_id = subtree.id
+            WHERE child.user_id = %s AND subtree.depth < %s
+        )
+        SELECT id FROM subtree
+        """,
+        [category_id, user_id, user_id, MAX_DEPTH - 1],
+    )
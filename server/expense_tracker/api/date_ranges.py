@@ -0,0 +1,143 @@
+"""
+Date filters as half-open `created_at` ranges.
+
+Filtering with `created_at__year`/`__month`/`__day` wraps the column in
+EXTRACT()/strftime(), which keeps the `(user, -created_at)` index from being
+used. Every date filter is turned instead into `start <= created_at < end`,
+with the bounds computed at local midnight in the requested time zone.
+
+Dates are accepted from `FIRST_DAY` to `LAST_DAY`. The margin keeps the
+neighbouring days, months and years of any accepted date, and its local
+midnight in any time zone, representable. Anything outside is rejected with a 400 (`DateOutOfRange`).
+"""
+
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+
+
+FIRST_DAY = date(2, 1, 1)
+LAST_DAY = date(9998, 12, 31)
+
+
+class DateOutOfRange(ParseError):
+    default_detail = f"Dates must be between {FIRST_DAY.isoformat()} and {LAST_DAY.isoformat()}."
+    default_code = 'date_out_of_range'
+
+
+def in_range(day):
+    if not FIRST_DAY <= day <= LAST_DAY:
+        raise DateOutOfRange()
+    return day
+
+
+def parse_day(value):
+    """
+    Parses 'YYYY-MM-DD' or 'DD-MM-YYYY'. Raises ValueError otherwise, and
+    `DateOutOfRange` for a valid date outside the supported range.
+    """
+    parts = value.split('-')
+    if len(parts) != 3:
+        raise ValueError(f"Invalid date '{value}'.")
+    if len(parts[0]) == 4:  # YYYY-MM-DD format
+        year, month, day = parts
+    else:  # DD-MM-YYYY format
+        day, month, year = parts
+    return in_range(date(int(year), int(month), int(day)))
+
+
+def add_months(day, months):
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def period_bounds(value):
+    """
+    Returns the `[start, end)` dates of the `date` query parameter, which
+    can be a year ("2025"), a month ("08-2025") or a day ("15-08-2025" or
+    "2025-08-15"). Raises ValueError for anything else.
+    """
+    if len(value) == 4:  # Year only
+        start = in_range(date(int(value), 1, 1))
+        return start, date(start.year + 1, 1, 1)
+    if len(value) == 7 and '-' in value:  # Month-Year
+        month, year = value.split('-')
+        start = in_range(date(int(year), int(month), 1))
+        return start, add_months(start, 1)
+    if len(value) == 10 and value.count('-') == 2:  # Full date
+        start = parse_day(value)
+        return start, start + timedelta(days=1)
+    raise ValueError(f"Invalid date '{value}'.")
+
+
+def get_timezone(name=None):
+    """
+    Returns the zone named `name` (IANA, e.g. 'America/Bogota'), or the
+    current time zone if it is missing or unknown.
+    """
+    if name:
+        try:
+            return ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+    return timezone.get_current_timezone()
+
+
+def to_datetime(day, tz):
+    return datetime.combine(day, time.min, tzinfo=tz)
+
+
+def filter_created_between(queryset, start=None, end=None, tz=None):
+    """
+    Keeps the rows created from local midnight of `start` (inclusive) to local
+    midnight of `end` (exclusive). Either bound can be omitted.
+    """
+    tz = tz or timezone.get_current_timezone()
+    if start is not None:
+        queryset = queryset.filter(created_at__gte=to_datetime(start, tz))
+    if end is not None:
+        queryset = queryset.filter(created_at__lt=to_datetime(end, tz))
+    return queryset
+
+
+def date_param_bounds(query_params):
+    """
+    Returns the `[start, end)` dates selected by the `date`, `from` and `to`
+    query parameters (`to` is inclusive), either of them None if unbounded.
+    Invalid values are ignored, dates out of the supported range raise
+    `DateOutOfRange`.
+    """
+    start = end = None
+
+    date_param = query_params.get('date')
+    if date_param:
+        try:
+            start, end = period_bounds(date_param)
+        except ValueError:
+            # Invalid date format, ignore filter
+            pass
+
+    try:
+        if query_params.get('from'):
+            day = parse_day(query_params['from'])
+            start = day if start is None else max(start, day)
+    except ValueError:
+        pass
+    try:
+        if query_params.get('to'):
+            day = parse_day(query_params['to']) + timedelta(days=1)
+            end = day if end is None else min(end, day)
+    except ValueError:
+        pass
+    return start, end
+
+
+def filter_by_date_params(queryset, query_params):
+    """
+    Applies the `date`, `from` and `to` query parameters (see
+    `date_param_bounds()`) in the time zone given by `tz`.
+    """
+    start, end = date_param_bounds(query_params)
+    return filter_created_between(queryset, start, end, get_timezone(query_params.get('tz')))
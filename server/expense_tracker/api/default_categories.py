@@ -1,4 +1,5 @@
 from django.db import models
+from .caching import DEFAULT_CATEGORIES, bump_version
 
 class DefaultCategory(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -62,4 +63,8 @@ class DefaultCategory(models.Model):
                     'order': order + 100,  # Offset to separate from expenses
                     'is_active': True
                 }
-            )
\ No newline at end of file
+            )
+
+        # Rows are written through get_or_create, but invalidate explicitly in
+        # case the cached list was built while this ran
+        bump_version(DEFAULT_CATEGORIES)
@@ -0,0 +1,114 @@
+import logging
+
+from rest_framework.exceptions import ParseError
+
+from . import rollups
+from .category_tree import get_category_tree
+from .date_ranges import date_param_bounds, filter_by_date_params, get_timezone
+from .search import search_transactions
+
+
+logger = logging.getLogger(__name__)
+
+# Largest value of a bigint primary key
+MAX_ID = 2 ** 63 - 1
+
+
+def parse_category_id(value):
+    """
+    Returns the `category_id` query parameter as an int. Raises ParseError
+    (a 400) for anything that cannot be a category's primary key.
+    """
+    try:
+        category_id = int(value)
+    except ValueError:
+        category_id = None
+    if category_id is None or not 0 < category_id <= MAX_ID:
+        raise ParseError("'category_id' must be a positive integer.")
+    return category_id
+
+
+def category_filter(query_params, user=None):
+    """
+    Returns `(category_type, ids)` for the category filter in `query_params`,
+    'category' or 'defaultcategory' and the ids to keep, or None if there is
+    none. `user` is needed for `include_subcategories`.
+    """
+    category_id = query_params.get('category_id')
+    category_type = query_params.get('category_type_model')
+    if not (category_id and category_type):
+        return None
+    category_id = parse_category_id(category_id)
+    category_type = category_type.lower()
+    include_subcategories = query_params.get('include_subcategories', '').lower() == 'true'
+    if category_type == 'category' and user is not None and include_subcategories:
+        return category_type, get_category_tree(user.id, category_id).subtree_ids(category_id)
+    if category_type in ('category', 'defaultcategory'):
+        return category_type, [category_id]
+    logger.warning("Unknown category_type_model %r in transaction filters", category_type)
+    return None
+
+
+def filter_transactions(queryset, query_params, user=None):
+    """
+    Applies the transaction list filters (is_expense, category, date/from/to, search)
+    found in `query_params` to `queryset`. Shared by every endpoint that
+    reads transactions so they all agree on what a filter means. `user` is
+    needed for `include_subcategories`.
+    """
+    # Filter by expense type
+    is_expense = query_params.get('is_expense')
+    if is_expense is not None:
+        queryset = queryset.filter(is_expense=(is_expense.lower() == 'true'))
+
+    # Filter by category, optionally with its subcategories
+    category = category_filter(query_params, user)
+    if category is not None:
+        category_type, ids = category
+        field = 'user_category_id' if category_type == 'category' else 'default_category_id'
+        queryset = queryset.filter(**{f'{field}__in': ids})
+
+    # Filter by date, as index-friendly created_at ranges
+    queryset = filter_by_date_params(queryset, query_params)
+
+    # Filter by keywords in notes, every word is matched as a prefix
+    search = query_params.get('search')
+    if search:
+        queryset = search_transactions(queryset, search)
+
+    return queryset
+
+
+def filter_rollup_dates(queryset, query_params):
+    """
+    Keeps the `TransactionRollup` rows covering the `date`, `from` and `to`
+    query parameters once (see `api.rollups.covering`). Returns None if the
+    dates are in a time zone other than the rollups'.
+    """
+    start, end = date_param_bounds(query_params)
+    if (start or end) and not rollups.in_rollup_zone(get_timezone(query_params.get('tz'))):
+        return None
+    return queryset.filter(rollups.covering(start, end))
+
+
+def filter_rollups(queryset, query_params, user=None, dates=True):
+    """
+    Applies the filters of `filter_transactions()` to a `TransactionRollup`
+    queryset, or returns None if they can only be answered from the
+    transactions: a search, or dates in a time zone other than the rollups'.
+    With `dates=False` the date filters are left to the caller, and rows of
+    both granularities are kept.
+    """
+    if query_params.get('search'):
+        return None
+
+    is_expense = query_params.get('is_expense')
+    if is_expense is not None:
+        queryset = queryset.filter(is_expense=(is_expense.lower() == 'true'))
+
+    category = category_filter(query_params, user)
+    if category is not None:
+        category_type, ids = category
+        queryset = queryset.filter(category_type=category_type, category_id__in=ids)
+
+    return filter_rollup_dates(queryset, query_params) if dates else queryset
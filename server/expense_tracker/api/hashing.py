@@ -0,0 +1,105 @@
+"""
+Password hashing off the request path.
+
+A PBKDF2 hash costs tens of milliseconds of CPU. Login and registration run
+it in a small thread pool (hashlib releases the GIL while it hashes) and wait
+for it asynchronously, so a burst of logins queues up here instead of taking
+every worker thread and stalling the rest of the API.
+
+At most `PASSWORD_HASHING_WORKERS` hashes run at once and
+`PASSWORD_HASHING_QUEUE` more may wait. Requests beyond that are turned away
+at once with a 503 (`HashingBusy`) instead of piling up.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+DEFAULT_WORKERS = 2
+DEFAULT_QUEUE = 16
+
+
+class HashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many sign-ins in progress, try again shortly.'
+    default_code = 'hashing_busy'
+    # Sent as Retry-After by DRF's exception handler
+    wait = 1
+
+
+class HashingPool:
+    """
+    Bounded thread pool with admission control. The executor is created on
+    first use, with the sizes configured at that time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+
+    def _start(self):
+        with self._lock:
+            if self._executor is None:
+                workers = getattr(settings, 'PASSWORD_HASHING_WORKERS', DEFAULT_WORKERS)
+                queue = getattr(settings, 'PASSWORD_HASHING_QUEUE', DEFAULT_QUEUE)
+                self._slots = threading.BoundedSemaphore(workers + queue)
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hashing')
+
+    async def run(self, fn, *args):
+        """
+        Runs `fn(*args)` in the pool and returns its result, or raises
+        `HashingBusy` if the pool and its queue are full.
+        """
+        if self._executor is None:
+            self._start()
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+pool = HashingPool()
+
+
+def _verify(password, encoded):
+    """
+    Returns whether `password` matches `encoded`, and its new hash if the
+    stored one uses outdated hasher settings.
+    """
+    is_correct, must_update = verify_password(password, encoded)
+    return is_correct, make_password(password) if is_correct and must_update else None
+
+
+async def acheck_password(user, password):
+    """
+    `user.check_password(password)`, hashing in the pool. Like it, upgrades
+    the stored hash when the hasher settings changed.
+    """
+    is_correct, new_encoded = await pool.run(_verify, password, user.password)
+    if new_encoded:
+        user.password = new_encoded
+        await sync_to_async(user.save)(update_fields=['password'])
+    return is_correct
+
+
+async def amake_password(password):
+    return await pool.run(make_password, password)
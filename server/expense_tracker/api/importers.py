@@ -0,0 +1,321 @@
+"""
+Bank statement import (CSV and OFX).
+
+Statements are parsed as a stream of `StatementRow`s, so a file is never held
+in memory as a whole, and written in `bulk_create` batches. Every imported
+transaction stores a content hash, which makes re-importing an overlapping
+statement skip the rows that are already there. Identical rows are told apart
+by their position among the rows of their posting date, which is only tracked
+for the last `OPEN_DATES` dates, so memory does not grow with the statement.
+"""
+
+import codecs
+import csv
+import hashlib
+import io
+import re
+import time
+from collections import Counter, OrderedDict, namedtuple
+from datetime import datetime, time as dt_time
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from . import rollups
+from .resolvers import default_categories
+from .models import Category, ChangeCounter, Transaction
+
+
+StatementRow = namedtuple('StatementRow', ['date', 'amount', 'notes', 'category'])
+
+
+class StatementError(ValueError):
+    pass
+
+
+CSV_COLUMNS = {
+    'date': ('date', 'posted', 'posting date', 'transaction date', 'fecha'),
+    'amount': ('amount', 'value', 'importe', 'monto'),
+    'notes': ('description', 'notes', 'memo', 'name', 'payee', 'concepto'),
+    'category': ('category', 'categoria'),
+}
+DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%m/%d/%Y', '%Y/%m/%d')
+
+# Posting dates whose duplicate counts are kept at once (see `Occurrences`)
+OPEN_DATES = 7
+
+
+def _parse_date(value):
+    value = value.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise StatementError(f"Unrecognized date '{value}'.")
+
+
+def _parse_amount(value):
+    try:
+        return Decimal(value.strip().replace(',', ''))
+    except (InvalidOperation, AttributeError):
+        raise StatementError(f"Unrecognized amount '{value}'.")
+
+
+def _text_stream(stream):
+    if isinstance(stream, io.TextIOBase):
+        return stream
+    # StreamReader only needs `read()`, so it also wraps Django upload objects
+    return codecs.getreader('utf-8-sig')(stream, errors='replace')
+
+
+def parse_csv(stream):
+    """
+    Yields a `StatementRow` per CSV line. Negative amounts are expenses.
+    The header must name at least a date and an amount column.
+    """
+    reader = csv.reader(_text_stream(stream))
+    header = next(reader, None)
+    if header is None:
+        return
+    normalized = [h.strip().lower() for h in header]
+    positions = {}
+    for field, names in CSV_COLUMNS.items():
+        positions[field] = next((normalized.index(n) for n in names if n in normalized), None)
+    if positions['date'] is None or positions['amount'] is None:
+        raise StatementError("CSV header must contain a date and an amount column.")
+
+    def cell(line, field):
+        index = positions[field]
+        return line[index].strip() if index is not None and index < len(line) else ''
+
+    for line in reader:
+        if not any(line):
+            continue
+        try:
+            row = StatementRow(
+                date=_parse_date(cell(line, 'date')),
+                amount=_parse_amount(cell(line, 'amount')),
+                notes=cell(line, 'notes'),
+                category=cell(line, 'category'),
+            )
+        except StatementError as e:
+            raise StatementError(f"Line {reader.line_num}: {e}") from e
+        yield row
+
+
+OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+
+
+def _ofx_tokens(text_stream, chunk_size=64 * 1024):
+    """
+    Yields `(closing, tag, value)` for every tag in an OFX document, reading it
+    in chunks. Works for both SGML (OFX 1.x, unclosed tags) and XML (OFX 2.x).
+    """
+    buffer = ''
+    while True:
+        chunk = text_stream.read(chunk_size)
+        buffer += chunk
+        # Keep the last, possibly incomplete, tag for the next round
+        cut = max(buffer.rfind('<'), 0) if chunk else len(buffer)
+        for match in OFX_TAG.finditer(buffer[:cut]):
+            yield match.group(1) == '/', match.group(2).upper(), match.group(3).strip()
+        buffer = buffer[cut:]
+        if not chunk:
+            return
+
+
+def _parse_ofx_date(value):
+    # YYYYMMDD, optionally followed by a time and a zone
+    try:
+        return datetime.strptime(value[:8], '%Y%m%d').date()
+    except ValueError:
+        raise StatementError(f"Unrecognized date '{value}'.")
+
+
+def _ofx_row(record):
+    if 'DTPOSTED' not in record or 'TRNAMT' not in record:
+        raise StatementError("Transaction without DTPOSTED or TRNAMT.")
+    return StatementRow(
+        date=_parse_ofx_date(record['DTPOSTED']),
+        amount=_parse_amount(record['TRNAMT']),
+        notes=' '.join(filter(None, [record.get('NAME', ''), record.get('MEMO', '')])),
+        category='',
+    )
+
+
+def parse_ofx(stream):
+    """
+    Yields a `StatementRow` per <STMTTRN> block of an OFX statement.
+    """
+    current, number = None, 0
+    for closing, tag, value in _ofx_tokens(_text_stream(stream)):
+        if tag == 'STMTTRN':
+            if closing and current is not None:
+                try:
+                    row = _ofx_row(current)
+                except StatementError as e:
+                    raise StatementError(f"OFX transaction {number}: {e}") from e
+                yield row
+                current = None
+            elif not closing:
+                current, number = {}, number + 1
+        elif current is not None and not closing and value:
+            current[tag] = value
+
+
+PARSERS = {
+    'csv': parse_csv,
+    'ofx': parse_ofx,
+    'qfx': parse_ofx,
+}
+
+
+def parser_for(filename, statement_format=None):
+    statement_format = (statement_format or filename.rsplit('.', 1)[-1]).lower()
+    try:
+        return PARSERS[statement_format]
+    except KeyError:
+        raise StatementError(f"Unsupported statement format '{statement_format}'. Use CSV or OFX.")
+
+
+class CategoryResolver:
+    """
+    Maps category names from a statement onto the user's categories, falling
+    back to the default ones. All names are loaded with one query per model
+    the first time they are needed, default ones come from the in-process resolver.
+    """
+    fallback = {True: 'other expenses', False: 'other income'}
+
+    def __init__(self, user):
+        self.user = user
+        self._by_name = None
+
+    def _load(self):
+        by_name = {}
+        for category in default_categories.all().values():
+            if not category.is_active:
+                continue
+            by_name[(category.name.lower(), category.is_expense)] = ('default_category', category)
+        # User categories win over default ones with the same name
+        for category in Category.objects.filter(user=self.user, is_active=True):
+            by_name[(category.name.lower(), category.is_expense)] = ('user_category', category)
+        self._by_name = by_name
+
+    def resolve(self, name, is_expense):
+        """
+        Returns `{'user_category': ...}` or `{'default_category': ...}` for the
+        matching category, or an empty dict if nothing matches.
+        """
+        if self._by_name is None:
+            self._load()
+        match = self._by_name.get(((name or '').strip().lower(), is_expense))
+        if match is None:
+            match = self._by_name.get((self.fallback[is_expense], is_expense))
+        return {match[0]: match[1]} if match else {}
+
+
+class Occurrences:
+    """
+    Numbers identical rows (same date, amount and notes) in the order they
+    appear: 1, 2, ... Counts are kept for the `OPEN_DATES` most recently seen
+    posting dates, so rows slightly out of date order are fine, but a date
+    that comes back after its counts were dropped is rejected: numbering it
+    from 1 again would skip its rows as duplicates.
+    """
+
+    def __init__(self):
+        self._open = OrderedDict()
+        self._closed = set()
+
+    def next(self, row):
+        counts = self._open.get(row.date)
+        if counts is None:
+            if row.date in self._closed:
+                raise StatementError(
+                    f"Rows dated {row.date.isoformat()} are spread across the statement. Sort it by date."
+                )
+            counts = self._open[row.date] = Counter()
+            if len(self._open) > OPEN_DATES:
+                closed, _ = self._open.popitem(last=False)
+                self._closed.add(closed)
+        else:
+            self._open.move_to_end(row.date)
+        identity = (row.amount, row.notes.strip().lower())
+        counts[identity] += 1
+        return counts[identity]
+
+
+def content_hash(row, occurrence):
+    """
+    Identifies a statement row by its content. `occurrence` tells apart
+    identical rows within the same statement (two equal purchases in a day).
+    """
+    key = f"{row.date.isoformat()}|{row.amount}|{row.notes.strip().lower()}|{occurrence}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def import_statement(user, rows, batch_size=1000, progress=None):
+    """
+    Writes the `rows` of a statement for `user` in batches of `batch_size`.
+    Rows already imported before (same content hash) are skipped, as are rows
+    with a zero amount or one the amount column cannot store. `progress`, if
+    given, is called after each batch with the running totals. Each batch is
+    committed on its own unless the caller wraps the import in a transaction.
+    Returns a dict with `read`, `created`, `duplicates`, `invalid` and
+    `rows_per_second`.
+    """
+    resolver = CategoryResolver(user)
+    amount_field = Transaction._meta.get_field('amount')
+    occurrences = Occurrences()
+    stats = {'read': 0, 'created': 0, 'duplicates': 0, 'invalid': 0, 'rows_per_second': 0.0}
+    started = time.monotonic()
+    batch = []
+
+    def flush():
+        hashes = [txn.import_hash for txn in batch]
+        existing = set(
+            Transaction.objects.filter(user=user, import_hash__in=hashes).values_list('import_hash', flat=True)
+        )
+        new = [txn for txn in batch if txn.import_hash not in existing]
+        with db_transaction.atomic():
+            ChangeCounter.stamp(new)
+            created = Transaction.objects.bulk_create(new)
+            rollups.record_bulk_create(created)
+        stats['created'] += len(created)
+        stats['duplicates'] += len(batch) - len(new)
+        batch.clear()
+        elapsed = time.monotonic() - started
+        stats['rows_per_second'] = round(stats['read'] / elapsed, 1) if elapsed else 0.0
+        if progress:
+            progress(dict(stats))
+
+    for row in rows:
+        stats['read'] += 1
+        try:
+            # Too many digits would fail the whole batch in the database
+            amount_field.run_validators(abs(row.amount))
+            valid = row.amount != 0
+        except ValidationError:
+            valid = False
+        if not valid:
+            stats['invalid'] += 1
+            continue
+        is_expense = row.amount < 0
+        occurrence = occurrences.next(row)
+        batch.append(Transaction(
+            user=user,
+            is_expense=is_expense,
+            amount=abs(row.amount),
+            notes=row.notes,
+            created_at=timezone.make_aware(datetime.combine(row.date, dt_time(12))),
+            import_hash=content_hash(row, occurrence),
+            **resolver.resolve(row.category, is_expense),
+        ))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return stats
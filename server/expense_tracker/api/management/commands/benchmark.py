@@ -0,0 +1,83 @@
+import json
+import platform
+import subprocess
+import time
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.benchmarks import compare, generate_dataset, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = ("Fills the database with synthetic data, times the API hot paths and writes the results as JSON. "
+            "Everything runs in a transaction that is rolled back at the end.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help="Number of users to generate.")
+        parser.add_argument('--transactions', type=int, default=1000, help="Transactions per user.")
+        parser.add_argument('--categories', type=int, default=10, help="Categories per user.")
+        parser.add_argument('--iterations', type=int, default=50, help="Timed requests per scenario.")
+        parser.add_argument('--seed', type=int, default=0, help="Seed for the data generator.")
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            help="Only run this scenario (can be repeated).")
+        parser.add_argument('--output', help="Write the results to this JSON file.")
+        parser.add_argument('--compare', help="Report regressions against a previous results file.")
+
+    def handle(self, *args, **options):
+        if min(options['users'], options['transactions'], options['categories'], options['iterations']) < 1:
+            raise CommandError("--users, --transactions, --categories and --iterations must be at least 1.")
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            users = generate_dataset(options['users'], options['transactions'], options['categories'],
+                                     seed=options['seed'])
+            self.stdout.write(f"Generated data in {time.perf_counter() - started:.1f}s.")
+            scenarios = run_benchmarks(users[0], iterations=options['iterations'], scenarios=options['scenarios'])
+            transaction.set_rollback(True)
+
+        results = {
+            'meta': {
+                'commit': self.get_commit(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'users': options['users'],
+                'transactions_per_user': options['transactions'],
+                'categories_per_user': options['categories'],
+                'seed': options['seed'],
+            },
+            'scenarios': scenarios,
+        }
+
+        for name, result in scenarios.items():
+            self.stdout.write(
+                f"{name:<28} p50={result['p50_ms']:>9.2f}ms p95={result['p95_ms']:>9.2f}ms "
+                f"queries={result['queries']:>3} peak={result['peak_memory_kb']:>9.1f}KB status={result['status']}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}."))
+
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read {options['compare']}: {e}")
+            regressions = compare(results, baseline)
+            for name, metric, before, after in regressions:
+                self.stdout.write(self.style.WARNING(f"{name} {metric}: {before} -> {after}"))
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
+
+    def get_commit(self):
+        try:
+            return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
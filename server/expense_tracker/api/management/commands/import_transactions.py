@@ -0,0 +1,45 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from api.importers import StatementError, import_statement, parser_for
+
+
+class Command(BaseCommand):
+    help = "Imports a CSV or OFX bank statement into a user's transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path', help="Path to the statement file.")
+        parser.add_argument('--format', dest='statement_format', choices=['csv', 'ofx', 'qfx'],
+                            help="Statement format. Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['username']}' does not exist.")
+
+        imported = {'created': 0}
+
+        def progress(stats):
+            imported.update(stats)
+            self.stdout.write(
+                f"{stats['read']} rows read, {stats['created']} created, "
+                f"{stats['duplicates']} duplicates ({stats['rows_per_second']} rows/s)"
+            )
+
+        try:
+            parse = parser_for(options['path'], options['statement_format'])
+            with open(options['path'], 'rb') as statement:
+                stats = import_statement(user, parse(statement), batch_size=options['batch_size'], progress=progress)
+        except (OSError, StatementError) as e:
+            # Batches are committed as they are written, so earlier ones stay
+            if imported['created']:
+                raise CommandError(f"{e} {imported['created']} transaction(s) were imported before the error.")
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats['created']} transaction(s), skipped {stats['duplicates']} duplicate(s) "
+            f"and {stats['invalid']} invalid row(s)."
+        ))
@@ -0,0 +1,33 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from api.rollups import find_drift, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the transaction rollup table from scratch, or checks it for drift with --check."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Only process the user with this username.")
+        parser.add_argument('--check', action='store_true',
+                            help="Report rollup rows that disagree with the transactions instead of rebuilding.")
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['user']}' does not exist.")
+
+        if options['check']:
+            drift = find_drift(user)
+            for key, (stored, expected) in sorted(drift.items(), key=str):
+                self.stdout.write(f"{key}: stored={stored} expected={expected}")
+            if drift:
+                raise CommandError(f"{len(drift)} rollup row(s) drifted. Run without --check to rebuild.")
+            self.stdout.write(self.style.SUCCESS("Rollups are consistent."))
+            return
+
+        count = rebuild_rollups(user)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} rollup row(s)."))
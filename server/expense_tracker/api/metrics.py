@@ -0,0 +1,109 @@
+"""
+In-process request metrics.
+
+`MetricsMiddleware` (see `api.middleware`) records the latency of every
+request and, for a sample of them, the number and duration of their database
+queries and the time spent rendering the response. The numbers are kept per
+process and endpoint, and exposed in the Prometheus text format by the
+`/metrics` view.
+"""
+
+import threading
+from bisect import bisect_left
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class EndpointStats:
+
+    def __init__(self):
+        self.count = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * len(LATENCY_BUCKETS)
+        self.sampled = 0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, method, route, status, latency, queries=None, db_seconds=0.0, render_seconds=0.0):
+        """
+        Records one request. `queries` is None for requests that were not
+        sampled, whose database and render times are unknown.
+        """
+        bucket = bisect_left(LATENCY_BUCKETS, latency)
+        with self._lock:
+            stats = self._stats.get((method, route, status))
+            if stats is None:
+                stats = self._stats[(method, route, status)] = EndpointStats()
+            stats.count += 1
+            stats.latency_sum += latency
+            if bucket < len(LATENCY_BUCKETS):
+                stats.latency_buckets[bucket] += 1
+            if queries is not None:
+                stats.sampled += 1
+                stats.queries += queries
+                stats.db_seconds += db_seconds
+                stats.render_seconds += render_seconds
+
+    def clear(self):
+        with self._lock:
+            self._stats = {}
+
+    def render(self):
+        """
+        Returns every metric in the Prometheus text exposition format.
+        """
+        with self._lock:
+            stats = sorted(self._stats.items())
+            stats = [(key, _copy(value)) for key, value in stats]
+
+        lines = [
+            '# HELP http_request_duration_seconds Request latency.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for (method, route, status), value in stats:
+            labels = _labels(method, route, status)
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, value.latency_buckets):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {value.count}')
+            lines.append(f'http_request_duration_seconds_sum{{{labels}}} {value.latency_sum:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{{labels}}} {value.count}')
+
+        for name, kind, help_text, attribute in (
+            ('http_requests_sampled_total', 'counter', 'Requests sampled for the metrics below.', 'sampled'),
+            ('http_request_db_queries_total', 'counter', 'Database queries run by sampled requests.', 'queries'),
+            ('http_request_db_seconds_total', 'counter', 'Database time of sampled requests.', 'db_seconds'),
+            ('http_request_render_seconds_total', 'counter', 'Response rendering time of sampled requests.',
+             'render_seconds'),
+        ):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for (method, route, status), value in stats:
+                number = getattr(value, attribute)
+                number = f'{number:.6f}' if isinstance(number, float) else number
+                lines.append(f'{name}{{{_labels(method, route, status)}}} {number}')
+        return '\n'.join(lines) + '\n'
+
+
+def _copy(stats):
+    copy = EndpointStats()
+    copy.__dict__.update(stats.__dict__, latency_buckets=list(stats.latency_buckets))
+    return copy
+
+
+def _labels(method, route, status):
+    route = route.replace('\\', '\\\\').replace('"', '\\"')
+    return f'method="{method}",route="{route}",status="{status}"'
+
+
+registry = MetricsRegistry()
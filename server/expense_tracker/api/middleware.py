@@ -0,0 +1,85 @@
+import random
+import time
+from contextlib import nullcontext
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .metrics import registry
+from .query_log import QueryRecorder
+
+
+class MetricsMiddleware:
+    """
+    Records the latency of every request in `api.metrics.registry`. A random
+    sample of requests (`METRICS_SAMPLE_RATE`) also records query count, DB
+    time and rendering time, and reports them in a `Server-Timing` header.
+    Works under both WSGI and ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'METRICS_SAMPLE_RATE', 0.1)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            # Keeps Django from running the hook in a thread for every response
+            self.process_template_response = self.aprocess_template_response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        with self.sample(request):
+            response = self.get_response(request)
+        return self.record(request, response, started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        with self.sample(request):
+            response = await self.get_response(request)
+        return self.record(request, response, started)
+
+    def sample(self, request):
+        """
+        Returns the query recorder of a sampled request, or a no-op context.
+        """
+        if not self.sample_rate or random.random() >= self.sample_rate:
+            return nullcontext()
+        request._metrics_recorder = QueryRecorder()
+        request._metrics_render = [0.0, 0.0]
+        return request._metrics_recorder
+
+    def record(self, request, response, started):
+        latency = time.perf_counter() - started
+        match = request.resolver_match
+        route = '/' + match.route if match else 'unmatched'
+        recorder = getattr(request, '_metrics_recorder', None)
+        if recorder is None:
+            registry.record(request.method, route, response.status_code, latency)
+            return response
+
+        render_started, render_finished = request._metrics_render
+        render_seconds = max(render_finished - render_started, 0.0)
+        registry.record(request.method, route, response.status_code, latency,
+                        queries=recorder.count, db_seconds=recorder.seconds, render_seconds=render_seconds)
+        response['Server-Timing'] = (
+            f'db;dur={recorder.seconds * 1000:.1f};desc="{recorder.count} queries", '
+            f'render;dur={render_seconds * 1000:.1f}, '
+            f'total;dur={latency * 1000:.1f}'
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered right after this hook
+        if getattr(request, '_metrics_recorder', None) is not None:
+            request._metrics_render[0] = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: request._metrics_render.__setitem__(1, time.perf_counter())
+            )
+        return response
+
+    async def aprocess_template_response(self, request, response):
+        return MetricsMiddleware.process_template_response(self, request, response)
@@ -0,0 +1,54 @@
+from django.db import migrations, models
+
+
+def copy_generic_category(apps, schema_editor):
+    """
+    Moves `category_type_model`/`category_id` onto the new foreign keys.
+    Transactions whose category no longer exists are left uncategorized.
+    """
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Transaction = apps.get_model('api', 'Transaction')
+    TransactionRollup = apps.get_model('api', 'TransactionRollup')
+    Category = apps.get_model('api', 'Category')
+    DefaultCategory = apps.get_model('api', 'DefaultCategory')
+
+    targets = [
+        ('category', Category, 'user_category_id'),
+        ('defaultcategory', DefaultCategory, 'default_category_id'),
+    ]
+    for model_name, model, field in targets:
+        content_type = ContentType.objects.filter(app_label='api', model=model_name).first()
+        if content_type is None:
+            continue
+        (Transaction.objects
+            .filter(category_type_model=content_type, category_id__in=model.objects.values('id'))
+            .update(**{field: models.F('category_id')}))
+        TransactionRollup.objects.filter(category_type_model=content_type).update(category_type=model_name)
+
+
+def copy_back_generic_category(apps, schema_editor):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Transaction = apps.get_model('api', 'Transaction')
+    TransactionRollup = apps.get_model('api', 'TransactionRollup')
+
+    for model_name, field in [('category', 'user_category_id'), ('defaultcategory', 'default_category_id')]:
+        content_type, _ = ContentType.objects.get_or_create(app_label='api', model=model_name)
+        (Transaction.objects
+            .filter(**{f'{field}__isnull': False})
+            .update(category_type_model=content_type, category_id=models.F(field)))
+        TransactionRollup.objects.filter(category_type=model_name).update(category_type_model=content_type)
+
+
+class Migration(migrations.Migration):
+    """
+    Data only. Updating the rows in the same migration as the schema changes
+    fails on PostgreSQL ("pending trigger events"), hence three migrations.
+    """
+
+    dependencies = [
+        ('api', '0004_transaction_category_foreign_keys'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_generic_category, copy_back_generic_category),
+    ]
@@ -0,0 +1,41 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_copy_transaction_categories'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='transactionrollup',
+            name='unique_transaction_rollup',
+        ),
+        migrations.AlterField(
+            model_name='transactionrollup',
+            name='category_type_model',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype'),
+        ),
+        migrations.RemoveField(
+            model_name='transactionrollup',
+            name='category_type_model',
+        ),
+        migrations.AddConstraint(
+            model_name='transactionrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'granularity', 'period', 'is_expense', 'category_type', 'category_id'), name='unique_transaction_rollup'),
+        ),
+        migrations.RemoveField(
+            model_name='transaction',
+            name='category_type_model',
+        ),
+        migrations.RemoveField(
+            model_name='transaction',
+            name='category_id',
+        ),
+        migrations.AddConstraint(
+            model_name='transaction',
+            constraint=models.CheckConstraint(condition=models.Q(('user_category__isnull', True), ('default_category__isnull', True), _connector='OR'), name='transaction_single_category'),
+        ),
+    ]
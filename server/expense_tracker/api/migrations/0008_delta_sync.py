@@ -0,0 +1,92 @@
+# Generated by Django 5.2.4 on 2026-10-18 04:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def number_existing_rows(apps, schema_editor):
+    """
+    Gives the existing categories and transactions of each user their place
+    in the user's change sequence, so a first sync pages through them.
+    """
+    Category = apps.get_model('api', 'Category')
+    Transaction = apps.get_model('api', 'Transaction')
+    ChangeCounter = apps.get_model('api', 'ChangeCounter')
+
+    counters = {}
+    for model in (Category, Transaction):
+        rows = list(model.objects.order_by('id').only('id', 'user_id'))
+        for row in rows:
+            counters[row.user_id] = row.change_seq = counters.get(row.user_id, 0) + 1
+        model.objects.bulk_update(rows, ['change_seq'], batch_size=1000)
+    ChangeCounter.objects.bulk_create(
+        [ChangeCounter(user_id=user_id, value=value) for user_id, value in counters.items()]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_transaction_import_hash'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category_id', models.PositiveIntegerField()),
+                ('change_seq', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ChangeCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='change_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['user', 'change_seq'], name='api_categor_user_id_f60ee4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'change_seq'], name='api_transac_user_id_d32e36_idx'),
+        ),
+        migrations.AddField(
+            model_name='categorytombstone',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_tombstones', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='categorytombstone',
+            index=models.Index(fields=['user', 'change_seq'], name='api_categor_user_id_3fe075_idx'),
+        ),
+        migrations.RunPython(number_existing_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+# Functional indexes for case-insensitive logins (see api.authentication.find_user).
+# auth.User belongs to another app, so they are created directly on its table.
+INDEXES = [
+    models.Index(Lower('username'), name='auth_user_username_lower_idx'),
+    models.Index(Lower('email'), name='auth_user_email_lower_idx'),
+]
+
+
+def add_indexes(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    for index in INDEXES:
+        schema_editor.add_index(User, index)
+
+
+def remove_indexes(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    for index in INDEXES:
+        schema_editor.remove_index(User, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_delta_sync'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_indexes, remove_indexes),
+    ]
@@ -0,0 +1,72 @@
+from django.db import migrations
+
+
+POSTGRES_SQL = [
+    """
+    ALTER TABLE api_transaction ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('simple', coalesce(notes, ''))) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS api_transaction_search_idx ON api_transaction USING GIN (search_vector)",
+]
+
+POSTGRES_REVERSE_SQL = [
+    "DROP INDEX IF EXISTS api_transaction_search_idx",
+    "ALTER TABLE api_transaction DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS api_transaction_fts
+    USING fts5(notes, content='api_transaction', content_rowid='id')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_transaction_fts_insert AFTER INSERT ON api_transaction BEGIN
+        INSERT INTO api_transaction_fts(rowid, notes) VALUES (new.id, new.notes);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_transaction_fts_delete AFTER DELETE ON api_transaction BEGIN
+        INSERT INTO api_transaction_fts(api_transaction_fts, rowid, notes) VALUES ('delete', old.id, old.notes);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS api_transaction_fts_update AFTER UPDATE OF notes ON api_transaction BEGIN
+        INSERT INTO api_transaction_fts(api_transaction_fts, rowid, notes) VALUES ('delete', old.id, old.notes);
+        INSERT INTO api_transaction_fts(rowid, notes) VALUES (new.id, new.notes);
+    END
+    """,
+    "INSERT INTO api_transaction_fts(api_transaction_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS api_transaction_fts_insert",
+    "DROP TRIGGER IF EXISTS api_transaction_fts_delete",
+    "DROP TRIGGER IF EXISTS api_transaction_fts_update",
+    "DROP TABLE IF EXISTS api_transaction_fts",
+]
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+    """
+    Full-text search index on transaction notes (see `api.search`): a
+    generated `tsvector` column with a GIN index on PostgreSQL, an FTS5 table
+    kept in sync by triggers on SQLite. Other databases get nothing.
+    """
+
+    dependencies = [
+        ('api', '0009_user_lower_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor({'postgresql': POSTGRES_SQL, 'sqlite': SQLITE_SQL}),
+            run_for_vendor({'postgresql': POSTGRES_REVERSE_SQL, 'sqlite': SQLITE_REVERSE_SQL}),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 05:37
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_transaction_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changecounter',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 05:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_changecounter_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transaction',
+            name='default_category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='transactions', to='api.defaultcategory'),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='user_category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='transactions', to='api.category'),
+        ),
+    ]
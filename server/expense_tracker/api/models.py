@@ -1,9 +1,9 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction as db_transaction
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from django.contrib.contenttypes.fields import GenericForeignKey
-from django.contrib.contenttypes.models import ContentType
+from .default_categories import DefaultCategory
+from .category_tree import get_category_tree, validate_parent
 
 
 class Category(models.Model):
@@ -19,11 +19,16 @@ class Category(models.Model):
     is_active       = models.BooleanField(default=True, db_index=True)
     
     created_at      = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated_at      = models.DateTimeField(auto_now=True)
     deleted_at      = models.DateTimeField(null=True, blank=True, db_index=True)
 
+    # Position of the last change in the user's change sequence (see ChangeCounter)
+    change_seq      = models.BigIntegerField(default=0, editable=False)
+
     class Meta:
         unique_together = ("user", "name")
         indexes = [
+            models.Index(fields=['user', 'change_seq']),
             models.Index(fields=['user', 'is_expense', 'is_active']),
             models.Index(fields=['user', 'parent_category']),
             models.Index(fields=['user', 'order', 'name']),
@@ -39,23 +44,23 @@ class Category(models.Model):
         if self.parent_category and self.parent_category == self:
             raise ValidationError({'parent_category': 'A category cannot be its own parent.'})
         
-        if self.parent_category:
-            current = self.parent_category
-            depth = 0
-            while current and depth < 5:
-                if current == self:
-                    raise ValidationError({'parent_category': 'Circular reference detected in category hierarchy.'})
-                current = current.parent_category
-                depth += 1
-            if depth >= 5:
-                raise ValidationError({'parent_category': 'Category hierarchy is too deep (max 5 levels).'})
+        if self.parent_category_id:
+            error = validate_parent(self.pk, self.parent_category_id)
+            if error:
+                raise ValidationError({'parent_category': error})
 
     def save(self, *args, **kwargs):
         self.full_clean()
-        super().save(*args, **kwargs)
+        with db_transaction.atomic():
+            ChangeCounter.stamp([self], kwargs)
+            super().save(*args, **kwargs)
 
     def __str__(self):
-        parent_name = f" > {self.parent_category.name}" if self.parent_category else ""
+        if self.parent_category_id and not self._meta.get_field('parent_category').is_cached(self):
+            parent = get_category_tree(self.user_id).name(self.parent_category_id)
+        else:
+            parent = self.parent_category.name if self.parent_category else None
+        parent_name = f" > {parent}" if parent else ""
         return f"{self.name}{parent_name} ({'Expense' if self.is_expense else 'Income'})"
     
     def soft_delete(self):
@@ -68,21 +73,43 @@ class Transaction(models.Model):
     user               = models.ForeignKey(User, on_delete=models.CASCADE, related_name="transactions", db_index=True)
     is_expense         = models.BooleanField(db_index=True)
 
-    category_type_model = models.ForeignKey(ContentType, on_delete=models.CASCADE)
-    category_id = models.PositiveIntegerField()
-    category = GenericForeignKey('category_type_model', 'category_id')    
+    # A transaction points at either one of the user's categories or a default one
+    user_category      = models.ForeignKey(Category, on_delete=models.RESTRICT, null=True, blank=True,
+                                           related_name="transactions")
+    default_category   = models.ForeignKey(DefaultCategory, on_delete=models.RESTRICT, null=True, blank=True,
+                                           related_name="transactions")
 
     amount             = models.DecimalField(max_digits=10, decimal_places=2)
     notes              = models.TextField(blank=True)
     
-    created_at         = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Not auto_now_add so imported statement rows keep their posting date
+    created_at         = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
+    updated_at         = models.DateTimeField(auto_now=True)
     deleted_at         = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    # Position of the last change in the user's change sequence (see ChangeCounter)
+    change_seq         = models.BigIntegerField(default=0, editable=False)
+
+    # Content hash of the statement row this transaction was imported from
+    import_hash        = models.CharField(max_length=64, null=True, blank=True, editable=False)
     
     class Meta:
         indexes = [
             models.Index(fields=['user']),
             models.Index(fields=['user', 'is_expense']),
             models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['user', 'change_seq']),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(user_category__isnull=True) | models.Q(default_category__isnull=True),
+                name='transaction_single_category',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'import_hash'],
+                condition=models.Q(import_hash__isnull=False),
+                name='unique_transaction_import_hash',
+            ),
         ]
         
         ordering = ['-id']
@@ -91,9 +118,21 @@ class Transaction(models.Model):
         if self.amount <= 0:
             raise ValidationError({'amount': 'Transaction amount must be positive.'})
 
+    def clean_fields(self, exclude=None):
+        # Related objects already loaded on the instance (the user, a resolved
+        # category) exist, so skip the query ForeignKey.validate() runs for
+        # each. Constraints and unique checks still cover these fields.
+        loaded = {
+            f.name for f in self._meta.concrete_fields
+            if f.is_relation and f.is_cached(self) and getattr(self, f.attname) is not None
+        }
+        super().clean_fields(exclude=set(exclude or ()) | loaded)
+
     def save(self, *args, **kwargs):
         self.full_clean()
-        super().save(*args, **kwargs)
+        with db_transaction.atomic():
+            ChangeCounter.stamp([self], kwargs)
+            super().save(*args, **kwargs)
 
     def soft_delete(self):
         self.deleted_at = timezone.now()
@@ -101,4 +140,129 @@ class Transaction(models.Model):
 
     @property
     def is_active(self):
-        return self.deleted_at is None
\ No newline at end of file
+        return self.deleted_at is None
+
+    @property
+    def category(self):
+        return self.user_category or self.default_category
+
+    @property
+    def category_type_model(self):
+        """
+        'category' or 'defaultcategory', the category type name used by the API.
+        """
+        if self.user_category_id is not None:
+            return 'category'
+        if self.default_category_id is not None:
+            return 'defaultcategory'
+        return None
+
+    @property
+    def category_id(self):
+        return self.user_category_id or self.default_category_id
+
+class TransactionRollup(models.Model):
+    """
+    Pre-aggregated totals of a user's active transactions per day and per
+    month, maintained incrementally by the handlers in `api.rollups`. The
+    summary, timeseries and category totals endpoints read them.
+    """
+    DAY = 'day'
+    MONTH = 'month'
+    GRANULARITY_CHOICES = [(DAY, 'Day'), (MONTH, 'Month')]
+
+    user                = models.ForeignKey(User, on_delete=models.CASCADE, related_name="rollups")
+    granularity         = models.CharField(max_length=5, choices=GRANULARITY_CHOICES)
+    period              = models.DateField()
+    is_expense          = models.BooleanField()
+    # 'category' or 'defaultcategory', empty with id 0 for uncategorized rows
+    category_type       = models.CharField(max_length=15)
+    category_id         = models.PositiveIntegerField()
+
+    total               = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count               = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'granularity', 'period', 'is_expense', 'category_type', 'category_id'],
+                name='unique_transaction_rollup',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'granularity', 'period']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} {self.granularity} {self.period}: {self.total} ({self.count})"
+
+
+class ChangeCounter(models.Model):
+    """
+    Per-user change sequence for delta sync (see `api.sync`). Every saved
+    category or transaction takes the next number into its `change_seq`.
+
+    Numbers are taken with an UPDATE of the user's row, which stays locked
+    until the saving transaction commits, so changes of a user become visible
+    in sequence order and a client never skips a number it has not seen yet.
+    The row also serves as the version (`value`) and modification date
+    (`updated_at`) of the user's data (see `api.user_data`).
+    """
+    user                = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True,
+                                               related_name="change_counter")
+    value               = models.BigIntegerField(default=0)
+    updated_at          = models.DateTimeField(default=timezone.now)
+
+    @classmethod
+    def reserve(cls, user_id, count=1):
+        """
+        Takes `count` consecutive numbers of the user's sequence and returns
+        the first one. Must run inside a transaction.
+        """
+        now = timezone.now()
+        if not cls.objects.filter(user_id=user_id).update(value=models.F('value') + count, updated_at=now):
+            try:
+                with db_transaction.atomic():
+                    cls.objects.create(user_id=user_id, value=count, updated_at=now)
+                return 1
+            except IntegrityError:
+                # Another request created the row first
+                cls.objects.filter(user_id=user_id).update(value=models.F('value') + count, updated_at=now)
+        return cls.objects.filter(user_id=user_id).values_list('value', flat=True).get() - count + 1
+
+    @classmethod
+    def stamp(cls, objs, save_kwargs=None):
+        """
+        Sets the next `change_seq` on each of `objs` before they are saved or
+        bulk created. With the keyword arguments of a `save()` call that has
+        `update_fields`, the sequence and `updated_at` are added to them.
+        """
+        by_user = {}
+        for obj in objs:
+            by_user.setdefault(obj.user_id, []).append(obj)
+        for user_id, user_objs in by_user.items():
+            first = cls.reserve(user_id, len(user_objs))
+            for offset, obj in enumerate(user_objs):
+                obj.change_seq = first + offset
+
+        if save_kwargs and save_kwargs.get('update_fields') is not None:
+            save_kwargs['update_fields'] = {*save_kwargs['update_fields'], 'change_seq', 'updated_at'}
+
+
+class CategoryTombstone(models.Model):
+    """
+    Records a deleted category for delta sync. Categories are deleted for
+    real, unlike transactions, whose tombstone is their `deleted_at`.
+    """
+    user                = models.ForeignKey(User, on_delete=models.CASCADE, related_name="category_tombstones")
+    category_id         = models.PositiveIntegerField()
+    change_seq          = models.BigIntegerField()
+    deleted_at          = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'change_seq']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} category {self.category_id} deleted at {self.change_seq}"
@@ -0,0 +1,22 @@
+from asgiref.sync import sync_to_async
+from rest_framework.pagination import CursorPagination
+
+
+class TransactionCursorPagination(CursorPagination):
+    """
+    Keyset pagination for transaction lists.
+
+    Pages are addressed with an opaque cursor over `-id` instead of an OFFSET,
+    so fetching page 1000 costs the same as fetching page 1. The response
+    carries `next`/`previous` links the client can follow as-is.
+
+    `apaginate_queryset()` is `paginate_queryset()` for async views: it runs
+    it, page query included, in a worker thread.
+    """
+    ordering = '-id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        return await sync_to_async(self.paginate_queryset)(queryset, request, view)
@@ -0,0 +1,147 @@
+"""
+Query budgets, to catch N+1 patterns before they reach production.
+
+`query_budget()` is a context manager (and decorator) that fails when the
+code inside runs more queries than allowed, or runs the same statement (up to
+its parameters) more times than allowed. `QueryBudgetMiddleware` applies the
+same check to every request served by a view of this app, with the budget
+declared by the view's `query_budget` and `query_repeat_limit` attributes,
+under both WSGI and ASGI. Transaction control statements (savepoints) are
+not counted.
+"""
+
+import logging
+import re
+from collections import Counter
+from contextlib import ContextDecorator
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from .query_log import QueryRecorder
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET = 10
+DEFAULT_REPEAT_LIMIT = 3
+
+_TRANSACTION_CONTROL = re.compile(r'^\s*(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT|BEGIN|COMMIT)\b', re.I)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b|%s')
+_IN_LIST = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def normalize_sql(sql):
+    """
+    Replaces the literal values in `sql` with `?`, so statements that only
+    differ by their parameters compare equal.
+    """
+    sql = _NUMBER.sub('?', _STRING.sub('?', sql))
+    return _IN_LIST.sub('(?)', sql)
+
+
+def check_queries(captured, max_queries=None, max_repeats=DEFAULT_REPEAT_LIMIT):
+    """
+    Returns a list of problems with `captured` (as recorded by
+    `CaptureQueriesContext`): going over `max_queries`, or running a
+    statement more than `max_repeats` times.
+    """
+    statements = [q['sql'] for q in captured if not _TRANSACTION_CONTROL.match(q['sql'])]
+    problems = []
+    if max_queries is not None and len(statements) > max_queries:
+        listing = '\n'.join(f'  {i}. {sql}' for i, sql in enumerate(statements, start=1))
+        problems.append(f'{len(statements)} queries run, budget is {max_queries}:\n{listing}')
+    if max_repeats is not None:
+        for sql, count in Counter(normalize_sql(sql) for sql in statements).most_common():
+            if count <= max_repeats:
+                break
+            problems.append(f'Same query run {count} times (limit {max_repeats}), likely an N+1:\n  {sql}')
+    return problems
+
+
+class query_budget(ContextDecorator):
+    """
+    Fails with `QueryBudgetExceeded` if the block runs more than
+    `max_queries` queries, or any statement more than `max_repeats` times.
+
+        with query_budget(3):
+            client.get(url)
+    """
+
+    def __init__(self, max_queries=None, max_repeats=DEFAULT_REPEAT_LIMIT, using='default'):
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+        self.using = using
+
+    def __enter__(self):
+        self.context = CaptureQueriesContext(connections[self.using])
+        self.context.__enter__()
+        return self.context
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.context.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            problems = check_queries(self.context.captured_queries, self.max_queries, self.max_repeats)
+            if problems:
+                raise QueryBudgetExceeded('\n'.join(problems))
+        return False
+
+
+class QueryBudgetMiddleware:
+    """
+    Checks the queries of every request to a view of this app against the
+    view's budget. `QUERY_BUDGET_MODE` is 'raise' (used by the tests), 'warn'
+    (logs the problems, for development) or 'off' (the default).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        mode = getattr(settings, 'QUERY_BUDGET_MODE', 'off')
+        if mode == 'off':
+            return self.get_response(request)
+
+        with QueryRecorder(keep_sql=True) as recorder:
+            response = self.get_response(request)
+        return self.check(request, response, recorder, mode)
+
+    async def __acall__(self, request):
+        mode = getattr(settings, 'QUERY_BUDGET_MODE', 'off')
+        if mode == 'off':
+            return await self.get_response(request)
+
+        with QueryRecorder(keep_sql=True) as recorder:
+            response = await self.get_response(request)
+        return self.check(request, response, recorder, mode)
+
+    def check(self, request, response, recorder, mode):
+        view_class = getattr(getattr(request.resolver_match, 'func', None), 'view_class', None)
+        if view_class is None or not view_class.__module__.startswith('api.'):
+            return response
+
+        problems = check_queries(
+            [{'sql': sql} for sql in recorder.statements],
+            getattr(view_class, 'query_budget', DEFAULT_BUDGET),
+            getattr(view_class, 'query_repeat_limit', DEFAULT_REPEAT_LIMIT),
+        )
+        if problems:
+            message = f'{request.method} {request.path} ({view_class.__name__}): ' + '\n'.join(problems)
+            if mode == 'raise':
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
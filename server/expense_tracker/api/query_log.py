@@ -0,0 +1,62 @@
+"""
+Per-request query recording that also works with the async ORM.
+
+Database connections belong to a thread, and async views run their queries in
+worker threads, so a `connection.execute_wrapper()` set up by a middleware
+would miss them. Instead every connection gets one permanent execute wrapper
+when it is created (see `api.signals`), and it reports to the `QueryRecorder`s
+active in the current context. Context variables follow a request into the
+threads running its queries, so each request only sees its own queries.
+"""
+
+import time
+from contextvars import ContextVar
+
+
+_recorders = ContextVar('query_recorders', default=())
+
+
+class QueryRecorder:
+    """
+    Counts the queries run while it is active and their time. With
+    `keep_sql`, the SQL of every statement (with placeholders) is kept too.
+
+        with QueryRecorder() as recorder:
+            ...
+        recorder.count, recorder.seconds
+    """
+
+    def __init__(self, keep_sql=False):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = [] if keep_sql else None
+
+    def __enter__(self):
+        self._token = _recorders.set(_recorders.get() + (self,))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _recorders.reset(self._token)
+        return False
+
+
+def record_queries(execute, sql, params, many, context):
+    recorders = _recorders.get()
+    if not recorders:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        for recorder in recorders:
+            recorder.count += 1
+            recorder.seconds += elapsed
+            if recorder.statements is not None:
+                recorder.statements.append(sql)
+
+
+def install(connection):
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_queries)
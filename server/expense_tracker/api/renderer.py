@@ -1,22 +1,83 @@
+"""
+JSON renderers.
+
+`FastJSONRenderer` encodes with orjson when it is installed, and falls back to
+the stdlib encoder (as DRF's `JSONRenderer` does) otherwise. Both produce
+compact UTF-8 JSON; `Decimal` values are written as strings, like DRF's
+`COERCE_DECIMAL_TO_STRING` (DRF's own encoder would turn a bare `Decimal`
+into a float), and datetimes in ISO 8601.
+"""
+
+import json
+from decimal import Decimal
+
 from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+class _Encoder(JSONEncoder):
+
+    def default(self, obj):
+        if isinstance(obj, Decimal):
+            return str(obj)
+        # Lazy strings, timedeltas, querysets... as DRF encodes them
+        return super().default(obj)
+
+
+_default = _Encoder().default
+
+
+def dumps(data):
+    """
+    Encodes `data` to compact UTF-8 JSON bytes.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+    return json.dumps(
+        data, cls=_Encoder, ensure_ascii=False, allow_nan=False, separators=(',', ':')
+    ).encode('utf-8')
+
+
+def loads(content):
+    """
+    Decodes JSON produced by `dumps()`.
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+class FastJSONRenderer(JSONRenderer):
 
-class CustomResponseRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        # Only the browsable API asks for indented output; let DRF handle it
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class CustomResponseRenderer(FastJSONRenderer):
     def render(self, data, accepted_media_type=None, renderer_context=None):
         status_code = renderer_context['response'].status_code
 
         # Determina si la respuesta es exitosa (códigos 2xx)
         is_success = str(status_code).startswith('2')
 
-        # Formato de la respuesta
-        response_data = {
-            'success': is_success
-        }
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            key = 'data' if is_success else 'error_details'
+            return super().render({'success': is_success, key: data}, accepted_media_type, renderer_context)
 
+        # El sobre {"success": ..., "data"/"error_details": ...} se escribe
+        # alrededor del cuerpo ya codificado, sin construir otro diccionario
         if is_success:
-            response_data['data'] = data
-        else:
-            # Para errores, `data` contendrá los detalles del error de DRF
-            response_data['error_details'] = data
-
-        # Llama al renderizador JSON base para convertir el diccionario a JSON
-        return super().render(response_data, accepted_media_type, renderer_context)
\ No newline at end of file
+            return b'{"success":true,"data":' + dumps(data) + b'}'
+        # Para errores, `data` contendrá los detalles del error de DRF
+        return b'{"success":false,"error_details":' + dumps(data) + b'}'
@@ -0,0 +1,65 @@
+"""
+Per-process lookup of default categories.
+
+Default categories almost never change, so each worker keeps them in an
+immutable id -> DefaultCategory map instead of querying them on every
+transaction write. The map is tagged with the `DEFAULT_CATEGORIES` cache
+version, which a write bumps (see `api.signals`). With a shared cache backend
+(file or redis) every worker sees the bump and reloads its map the next time
+it is used. The locmem backend only bumps the version in the worker that
+handled the write, so maps are also reloaded once they are `MAX_AGE` seconds
+old; that is how long other workers may keep a stale map.
+"""
+
+import threading
+import time
+from types import MappingProxyType
+
+from .caching import DEFAULT_CATEGORIES, get_version
+from .default_categories import DefaultCategory
+
+
+MAX_AGE = 300
+
+
+class DefaultCategoryResolver:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._loaded_at = 0.0
+        self._by_id = MappingProxyType({})
+
+    def _is_current(self, version):
+        return version == self._version and time.monotonic() - self._loaded_at < MAX_AGE
+
+    def all(self):
+        """
+        Returns a read-only mapping of every default category by id.
+        """
+        version = get_version(DEFAULT_CATEGORIES)
+        if not self._is_current(version):
+            with self._lock:
+                if not self._is_current(version):
+                    self._by_id = MappingProxyType({c.id: c for c in DefaultCategory.objects.all()})
+                    self._version = version
+                    self._loaded_at = time.monotonic()
+        return self._by_id
+
+    def get(self, category_id):
+        """
+        Returns the default category with `category_id`. Raises
+        `DefaultCategory.DoesNotExist` like `DefaultCategory.objects.get`.
+        """
+        try:
+            return self.all()[category_id]
+        except (KeyError, TypeError):
+            raise DefaultCategory.DoesNotExist(f"Default category {category_id} does not exist.")
+
+    def clear(self):
+        with self._lock:
+            self._version = None
+            self._by_id = MappingProxyType({})
+
+
+default_categories = DefaultCategoryResolver()
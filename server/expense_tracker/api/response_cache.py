@@ -0,0 +1,114 @@
+"""
+In-process cache of transaction list responses.
+
+Users page through the same filter combinations over and over. Each worker
+keeps the data of recent responses, keyed by user, normalized query
+parameters and the user's data version, so a repeated request costs one
+primary key lookup instead of the page query. The version is the user's
+`ChangeCounter` value (see `api.user_data`), read from the database on every
+request: a write through any worker changes it, and every worker's entries
+for the older version become misses. They are freed when they are next read
+or when an entry for the new version is stored.
+
+Entries are evicted least recently used first, per user
+(`TRANSACTION_CACHE_USER_ENTRIES`) and for the worker as a whole
+(`TRANSACTION_CACHE_MAX_BYTES`). Responses larger than a sixteenth of the
+total are not cached.
+"""
+
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_USER_ENTRIES = 64
+
+
+def normalize_params(query_params):
+    """
+    Returns the query parameters as a sorted tuple without empty values, so
+    requests that only differ by parameter order share an entry.
+    """
+    items = []
+    for name in sorted(query_params):
+        values = sorted(value.strip() for value in query_params.getlist(name) if value.strip())
+        if values:
+            items.append((name, tuple(values)))
+    return tuple(items)
+
+
+class ResponseCache:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (user_id, key) -> (version, data, size)
+        self._user_keys = {}           # user_id -> OrderedDict of keys, oldest first
+        self.size = 0
+
+    @property
+    def max_bytes(self):
+        return getattr(settings, 'TRANSACTION_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES)
+
+    @property
+    def max_user_entries(self):
+        return getattr(settings, 'TRANSACTION_CACHE_USER_ENTRIES', DEFAULT_USER_ENTRIES)
+
+    def get(self, user_id, version, key):
+        """
+        Returns the data cached for `key` at `version` of the user's data,
+        or None.
+        """
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry is None:
+                return None
+            if entry[0] != version:
+                self._remove(user_id, key)
+                return None
+            self._entries.move_to_end((user_id, key))
+            self._user_keys[user_id].move_to_end(key)
+            return entry[1]
+
+    def set(self, user_id, version, key, data, size):
+        """
+        Caches `data`, whose encoded size is `size` bytes. It must not be
+        modified afterwards. The user's entries for other versions are dropped.
+        """
+        max_bytes = self.max_bytes
+        if size > max_bytes // 16 or not self.max_user_entries:
+            return
+        with self._lock:
+            for stale_key in list(self._user_keys.get(user_id, ())):
+                if stale_key == key or self._entries[(user_id, stale_key)][0] != version:
+                    self._remove(user_id, stale_key)
+            self._entries[(user_id, key)] = (version, data, size)
+            self._user_keys.setdefault(user_id, OrderedDict())[key] = None
+            self.size += size
+
+            user_keys = self._user_keys[user_id]
+            while len(user_keys) > self.max_user_entries:
+                self._remove(user_id, next(iter(user_keys)))
+            while self.size > max_bytes:
+                self._remove(*next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, user_id, key):
+        _, _, size = self._entries.pop((user_id, key))
+        self.size -= size
+        user_keys = self._user_keys[user_id]
+        del user_keys[key]
+        if not user_keys:
+            del self._user_keys[user_id]
+
+
+transaction_lists = ResponseCache()
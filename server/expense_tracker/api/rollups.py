@@ -0,0 +1,249 @@
+"""
+Incremental maintenance of `TransactionRollup`, and reads from it.
+
+Every write to a `Transaction` is turned into a delta (sum and count) that is
+applied to the day and month rows the transaction falls into. Soft-deleted
+transactions do not count, so `soft_delete()` simply removes the contribution.
+
+Periods are local dates in the default time zone (`TIME_ZONE`). Totals over
+dates in that zone are read from the rollups instead of the transactions (see
+`api.filters.filter_rollups`): whole months from the month rows and the days
+at either end from the day rows, see `covering()`.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction as db_transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDay, TruncMonth
+from django.utils import timezone
+
+from .date_ranges import add_months
+from .models import Transaction, TransactionRollup
+
+
+GRANULARITY_TRUNCS = {
+    TransactionRollup.DAY: TruncDay,
+    TransactionRollup.MONTH: TruncMonth,
+}
+
+
+def in_rollup_zone(tz):
+    """
+    Returns whether local dates in `tz` are the dates of the rollup periods.
+    """
+    return str(tz) == str(timezone.get_default_timezone())
+
+
+def covering(start=None, end=None):
+    """
+    Returns a Q selecting the rollup rows that cover the days from `start`
+    (inclusive) to `end` (exclusive) exactly once: month rows for the whole
+    months in between, and day rows for the rest. Either bound can be omitted.
+    """
+    def between(granularity, first, stop):
+        q = Q(granularity=granularity)
+        if first is not None:
+            q &= Q(period__gte=first)
+        if stop is not None:
+            q &= Q(period__lt=stop)
+        return q
+
+    first_month = start if start is None or start.day == 1 else add_months(start, 1)
+    end_month = end if end is None or end.day == 1 else end.replace(day=1)
+    if first_month is not None and end_month is not None and first_month >= end_month:
+        # No whole month in the range
+        return between(TransactionRollup.DAY, start, end)
+
+    q = between(TransactionRollup.MONTH, first_month, end_month)
+    if start is not None and start < first_month:
+        q |= between(TransactionRollup.DAY, start, first_month)
+    if end is not None and end_month < end:
+        q |= between(TransactionRollup.DAY, end_month, end)
+    return q
+
+
+def _periods(created_at):
+    if timezone.is_aware(created_at):
+        day = timezone.localdate(created_at, timezone.get_default_timezone())
+    else:
+        day = created_at.date()
+    return {
+        TransactionRollup.DAY: day,
+        TransactionRollup.MONTH: day.replace(day=1),
+    }
+
+
+def _category_key(user_category_id, default_category_id):
+    if user_category_id is not None:
+        return 'category', user_category_id
+    if default_category_id is not None:
+        return 'defaultcategory', default_category_id
+    return '', 0
+
+
+def _contribution(txn):
+    """
+    Returns the rollup key fields for `txn`, or None if it does not count.
+    """
+    if txn.deleted_at is not None or txn.created_at is None:
+        return None
+    category_type, category_id = _category_key(txn.user_category_id, txn.default_category_id)
+    return {
+        'user_id': txn.user_id,
+        'is_expense': txn.is_expense,
+        'category_type': category_type,
+        'category_id': category_id,
+        'created_at': txn.created_at,
+        'amount': txn.amount,
+    }
+
+
+def _apply_delta(lookup, amount, count):
+    with db_transaction.atomic():
+        updated = TransactionRollup.objects.filter(**lookup).update(
+            total=F('total') + amount, count=F('count') + count
+        )
+        if updated:
+            return
+        try:
+            with db_transaction.atomic():
+                TransactionRollup.objects.create(total=amount, count=count, **lookup)
+        except IntegrityError:
+            # Another writer created the row first, add to it instead
+            TransactionRollup.objects.filter(**lookup).update(
+                total=F('total') + amount, count=F('count') + count
+            )
+
+
+def _apply(contribution, sign):
+    key = {k: v for k, v in contribution.items() if k not in ('created_at', 'amount')}
+    amount = Decimal(contribution['amount']) * sign
+
+    for granularity, period in _periods(contribution['created_at']).items():
+        _apply_delta(dict(key, granularity=granularity, period=period), amount, sign)
+
+
+def capture_previous(txn):
+    """
+    Remembers the stored state of `txn` before it is overwritten so the
+    post-save handler can take its old contribution out.
+    """
+    txn._rollup_previous = None
+    if txn.pk:
+        previous = Transaction.objects.filter(pk=txn.pk).first()
+        if previous is not None:
+            txn._rollup_previous = _contribution(previous)
+
+
+def record_save(txn):
+    previous = getattr(txn, '_rollup_previous', None)
+    current = _contribution(txn)
+    if previous == current:
+        return
+    if previous:
+        _apply(previous, -1)
+    if current:
+        _apply(current, 1)
+    txn._rollup_previous = current
+
+
+def record_delete(txn):
+    current = _contribution(txn)
+    if current:
+        _apply(current, -1)
+
+
+def record_bulk_create(txns):
+    """
+    Adds transactions inserted with `bulk_create` (which skips the save
+    signals), merging them so each rollup row is touched only once.
+    """
+    deltas = defaultdict(lambda: [Decimal('0.00'), 0])
+    for txn in txns:
+        contribution = _contribution(txn)
+        if not contribution:
+            continue
+        key = tuple((k, v) for k, v in contribution.items() if k not in ('created_at', 'amount'))
+        for granularity, period in _periods(contribution['created_at']).items():
+            delta = deltas[key + (('granularity', granularity), ('period', period))]
+            delta[0] += Decimal(contribution['amount'])
+            delta[1] += 1
+
+    for key, (amount, count) in deltas.items():
+        _apply_delta(dict(key), amount, count)
+
+
+def compute_rollups(user=None):
+    """
+    Aggregates the rollup rows straight from `Transaction`. Returns a dict
+    mapping each rollup key to `(total, count)`.
+    """
+    queryset = Transaction.objects.filter(deleted_at__isnull=True)
+    if user is not None:
+        queryset = queryset.filter(user=user)
+
+    expected = defaultdict(lambda: (Decimal('0.00'), 0))
+    for granularity, trunc in GRANULARITY_TRUNCS.items():
+        rows = (
+            queryset.order_by()
+            .annotate(period=trunc('created_at', tzinfo=timezone.get_default_timezone()))
+            .values('user_id', 'period', 'is_expense', 'user_category_id', 'default_category_id')
+            .annotate(total=Sum('amount'), count=Count('id'))
+        )
+        for row in rows:
+            period = row['period']
+            if hasattr(period, 'date'):
+                period = period.date()
+            category_type, category_id = _category_key(row['user_category_id'], row['default_category_id'])
+            key = (row['user_id'], granularity, period, row['is_expense'], category_type, category_id)
+            expected[key] = (row['total'], row['count'])
+    return dict(expected)
+
+
+def stored_rollups(user=None):
+    queryset = TransactionRollup.objects.all()
+    if user is not None:
+        queryset = queryset.filter(user=user)
+    return {
+        (r.user_id, r.granularity, r.period, r.is_expense, r.category_type, r.category_id): (r.total, r.count)
+        for r in queryset
+        if r.count or r.total
+    }
+
+
+def find_drift(user=None):
+    """
+    Returns the keys whose stored `(total, count)` differ from the source of
+    truth, as a dict of `key -> (stored, expected)`.
+    """
+    expected = compute_rollups(user)
+    stored = stored_rollups(user)
+    missing = (Decimal('0.00'), 0)
+    return {
+        key: (stored.get(key, missing), expected.get(key, missing))
+        for key in set(expected) | set(stored)
+        if stored.get(key, missing) != expected.get(key, missing)
+    }
+
+
+def rebuild_rollups(user=None):
+    """
+    Throws away the stored rollups and recomputes them from `Transaction`.
+    """
+    rows = [
+        TransactionRollup(
+            user_id=user_id, granularity=granularity, period=period, is_expense=is_expense,
+            category_type=category_type, category_id=category_id, total=total, count=count,
+        )
+        for (user_id, granularity, period, is_expense, category_type, category_id), (total, count)
+        in compute_rollups(user).items()
+    ]
+    with db_transaction.atomic():
+        queryset = TransactionRollup.objects.all()
+        if user is not None:
+            queryset = queryset.filter(user=user)
+        queryset.delete()
+        TransactionRollup.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
@@ -0,0 +1,84 @@
+"""
+Full-text search over transaction notes.
+
+PostgreSQL keeps a generated `tsvector` column with a GIN index; SQLite (used
+by the tests) keeps an FTS5 index synced by triggers. Both are created by
+migration 0010, and every search term is matched as a prefix. Any other
+database falls back to `icontains` filters.
+
+SQLite rebuilds a table to alter it, which drops its triggers: a later
+migration that alters `api_transaction` must create them again.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Value
+from django.db.models.expressions import RawSQL
+
+
+TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def search_terms(text):
+    return TERM_PATTERN.findall(text or '')
+
+
+def search_transactions(queryset, text):
+    """
+    Keeps the transactions whose notes contain every word of `text`, each
+    matched as a prefix.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return queryset
+
+    if connection.vendor == 'postgresql':
+        return queryset.filter(RawSQL(
+            "api_transaction.search_vector @@ to_tsquery('simple', %s)",
+            [_postgres_query(terms)], output_field=BooleanField(),
+        ))
+    if connection.vendor == 'sqlite':
+        return queryset.filter(id__in=RawSQL(
+            "SELECT rowid FROM api_transaction_fts WHERE api_transaction_fts MATCH %s",
+            [_fts5_query(terms)],
+        ))
+
+    for term in terms:
+        queryset = queryset.filter(notes__icontains=term)
+    return queryset
+
+
+def rank_transactions(queryset, text):
+    """
+    Filters like `search_transactions` and orders the result by relevance,
+    best match first. The score is available as `rank`.
+    """
+    terms = search_terms(text)
+    queryset = search_transactions(queryset, text)
+    if not terms:
+        return queryset.annotate(rank=Value(0.0, output_field=FloatField()))
+
+    if connection.vendor == 'postgresql':
+        rank = RawSQL(
+            "ts_rank(api_transaction.search_vector, to_tsquery('simple', %s))",
+            [_postgres_query(terms)], output_field=FloatField(),
+        )
+    elif connection.vendor == 'sqlite':
+        # bm25() is lower for better matches, negate it so higher is better
+        rank = RawSQL(
+            "SELECT -bm25(api_transaction_fts) FROM api_transaction_fts "
+            "WHERE api_transaction_fts MATCH %s AND rowid = api_transaction.id",
+            [_fts5_query(terms)], output_field=FloatField(),
+        )
+    else:
+        rank = Value(0.0, output_field=FloatField())
+    return queryset.annotate(rank=rank).order_by('-rank', '-id')
+
+
+def _postgres_query(terms):
+    return ' & '.join(f"{term}:*" for term in terms)
+
+
+def _fts5_query(terms):
+    return ' AND '.join(f'"{term}"*' for term in terms)
@@ -2,8 +2,8 @@ from rest_framework import serializers
 from .default_categories import DefaultCategory
 from django.core.validators import RegexValidator
 from .models import Category, Transaction
+from .resolvers import default_categories
 from decimal import Decimal
-from django.contrib.contenttypes.models import ContentType
     
 
 hex_color_validator = RegexValidator(
@@ -16,6 +16,8 @@ class CategorySerializer(serializers.ModelSerializer):
         'min_length': 'Category name cannot be empty.'
     })
     color = serializers.CharField(max_length=7, default='#6B7280', validators=[hex_color_validator])
+    # Read-only, but the default lets UniqueTogetherValidator check (user, name)
+    user = serializers.PrimaryKeyRelatedField(read_only=True, default=serializers.CurrentUserDefault())
 
     class Meta:
         model = Category
@@ -37,6 +39,18 @@ class CategoryNestedSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'name', 'is_expense']
 
 
+class EmbeddedCategorySerializer(serializers.Serializer):
+    """
+    Read-only category payload embedded in transactions with `?expand=category`.
+    Works for both `Category` and `DefaultCategory` rows.
+    """
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    is_expense = serializers.BooleanField()
+    icon = serializers.CharField()
+    color = serializers.CharField()
+
+
 class TransactionSerializer(serializers.ModelSerializer):
     category_id = serializers.IntegerField(
         error_messages={
@@ -44,6 +58,8 @@ class TransactionSerializer(serializers.ModelSerializer):
             'required': "Category ID is required."
         }
     )
+    # `category_id`/`category_type_model` are the public API for the category and are
+    # mapped onto the `user_category`/`default_category` foreign keys of the model.
     category_type_model = serializers.CharField(required=True)
 
     amount = serializers.DecimalField(
@@ -69,28 +85,46 @@ class TransactionSerializer(serializers.ModelSerializer):
 
         model_name = category_type_model.capitalize()
 
+        # Bulk writes preload the referenced user categories into the context
+        preloaded = self.context.get('categories')
+
         category_instance = None
         if model_name == 'Category':
             try:
-                category_instance = Category.objects.get(id=category_id, user=self.context['request'].user)
-            except Category.DoesNotExist:
+                if preloaded is not None:
+                    category_instance = preloaded['Category'][category_id]
+                else:
+                    category_instance = Category.objects.get(id=category_id, user=self.context['request'].user)
+            except (Category.DoesNotExist, KeyError):
                 raise serializers.ValidationError({"category": "User category not found or does not belong to you."})
         elif model_name == 'Defaultcategory':
              try:
-                category_instance = DefaultCategory.objects.get(id=category_id)
+                category_instance = default_categories.get(category_id)
              except DefaultCategory.DoesNotExist:
                 raise serializers.ValidationError({"category": "Default category not found."})
         else:
             raise serializers.ValidationError({"category_type_model": "Invalid category type specified. Must be 'Category' or 'DefaultCategory'."})
 
-        data['category_type_model'] = ContentType.objects.get_for_model(category_instance)
-        data['category_id'] = category_instance.id
+        data.pop('category_id', None)
+        if model_name == 'Category':
+            data['user_category'] = category_instance
+            data['default_category'] = None
+        else:
+            data['default_category'] = category_instance
+            data['user_category'] = None
 
         return data
     
     def create(self, validated_data):
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if 'category' in self.context.get('expand', ()):
+            category = instance.category
+            data['category'] = EmbeddedCategorySerializer(category).data if category else None
+        return data
     
 
 class DefaultCategorySerializer(serializers.ModelSerializer):
@@ -1,6 +1,15 @@
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_migrate, pre_save, post_save, pre_delete, post_delete
 from django.dispatch import receiver
+from django.contrib.auth.models import User
+from django.db.backends.signals import connection_created
 from .default_categories import DefaultCategory # Asegúrate de la ruta de importación correcta
+from .models import Category, Transaction
+from . import rollups
+from .caching import DEFAULT_CATEGORIES, bump_version
+from .category_tree import invalidate_category_tree
+from . import query_log
+from .authentication import invalidate_auth_user
+from .sync import record_category_delete
 
 @receiver(post_migrate)
 def populate_default_categories(sender, **kwargs):
@@ -21,4 +30,68 @@ def populate_default_categories(sender, **kwargs):
             DefaultCategory.populate_defaults()
             print("Default categories populated successfully.")
         else:
-            print("Default categories already exist. Skipping population.")
\ No newline at end of file
+            print("Default categories already exist. Skipping population.")
+
+
+@receiver(post_save, sender=DefaultCategory)
+@receiver(post_delete, sender=DefaultCategory)
+def invalidate_default_categories(sender, **kwargs):
+    bump_version(DEFAULT_CATEGORIES)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_user_category_tree(sender, instance, **kwargs):
+    invalidate_category_tree(instance.user_id)
+
+
+@receiver(pre_delete, sender=Category)
+def record_category_tombstone(sender, instance, **kwargs):
+    """
+    Lets delta sync clients know the category is gone.
+    """
+    record_category_delete(instance)
+
+
+@receiver(pre_save, sender=Transaction)
+def capture_transaction_for_rollup(sender, instance, raw=False, **kwargs):
+    """
+    Keeps the stored version of the transaction so its old contribution can be
+    removed from the rollups once the new one is saved.
+    """
+    if raw:
+        return
+    rollups.capture_previous(instance)
+
+
+@receiver(post_save, sender=Transaction)
+def update_rollup_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    rollups.record_save(instance)
+
+
+@receiver(post_delete, sender=Transaction)
+def update_rollup_on_delete(sender, instance, origin=None, **kwargs):
+    # Deleting a user deletes their rollups too, there is nothing to update
+    if isinstance(origin, User) or getattr(origin, 'model', None) is User:
+        return
+    rollups.record_delete(instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_auth_user(sender, instance, **kwargs):
+    """
+    Drops the user cached for JWT authentication when it changes.
+    """
+    invalidate_auth_user(instance.pk)
+
+
+@receiver(connection_created)
+def install_query_recording(sender, connection, **kwargs):
+    """
+    Lets the request metrics and query budgets see the queries of this
+    connection, whichever thread runs them.
+    """
+    query_log.install(connection)
@@ -3,13 +3,17 @@ Base test case for API tests.
 """
 
 from django.contrib.auth.models import User
+from django.test import override_settings
 from rest_framework.test import APITestCase
 from rest_framework_simplejwt.tokens import RefreshToken
 
 
+@override_settings(QUERY_BUDGET_MODE='raise')
 class BaseAPITestCase(APITestCase):
     """
-    Base class for API test cases with user authentication helpers.
+    Base class for API test cases with user authentication helpers. Every
+    request is checked against the query budget of its view (see
+    `api.query_guard`).
     """
 
     def setUp(self):
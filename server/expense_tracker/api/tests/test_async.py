@@ -0,0 +1,66 @@
+from decimal import Decimal
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+from rest_framework import status
+from .base import BaseAPITestCase
+from api.metrics import registry
+from api.models import Category, Transaction
+
+
+class AsyncViewsTestCase(BaseAPITestCase):
+    """
+    Tests for the async read endpoints, served through the ASGI handler.
+    """
+
+    def setUp(self):
+        super().setUp()
+        registry.clear()
+        self.category = Category.objects.create(user=self.user, name="Groceries", is_expense=True)
+        for amount in ('10.00', '2.50'):
+            Transaction.objects.create(user=self.user, user_category=self.category,
+                                       amount=Decimal(amount), is_expense=True)
+        self.async_client = AsyncClient()
+        self.auth = {'Authorization': self.get_auth_headers()['HTTP_AUTHORIZATION']}
+
+    async def test_transaction_list_and_summary(self):
+        """
+        Ensure the list pages and the summary work through the ASGI handler.
+        """
+        response = await self.async_client.get(reverse('transaction-list') + '?page_size=1', headers=self.auth)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual([t['amount'] for t in data['results']], ['2.50'])
+
+        response = await self.async_client.get(data['next'], headers=self.auth)
+        self.assertEqual([t['amount'] for t in response.json()['results']], ['10.00'])
+
+        response = await self.async_client.get(reverse('transaction-summary'), headers=self.auth)
+        self.assertEqual(response.json()['total_expenses'], '12.50')
+
+    async def test_categories_and_current_user(self):
+        """
+        Ensure the category list/create and auth/me endpoints work through the ASGI handler.
+        """
+        response = await self.async_client.get(reverse('category-list-create'), headers=self.auth)
+        self.assertEqual([c['name'] for c in response.json()], ['Groceries'])
+
+        response = await self.async_client.post(
+            reverse('category-list-create'), {'name': '', 'is_expense': True}, content_type='application/json',
+            headers=self.auth,
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('name', response.json())
+
+        response = await self.async_client.get(reverse('user_detail'), headers=self.auth)
+        self.assertEqual(response.json()['username'], 'testuser')
+
+        response = await AsyncClient().get(reverse('user_detail'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(METRICS_SAMPLE_RATE=1.0)
+    async def test_queries_are_recorded_for_async_views(self):
+        """
+        Ensure the queries run by the async ORM reach the request metrics.
+        """
+        response = await self.async_client.get(reverse('transaction-list'), headers=self.auth)
+        self.assertRegex(response['Server-Timing'], r'desc="[1-9]\d* queries"')
@@ -0,0 +1,157 @@
+import asyncio
+import threading
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from .base import BaseAPITestCase
+from api.authentication import find_user
+from api.hashing import HashingBusy, HashingPool
+from api.throttling import LoginRateThrottle
+
+
+# Throttle buckets in memory, not in the file cache a dev server may be using
+THROTTLE_CACHES = {
+    **settings.CACHES,
+    'throttle': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test-throttle'},
+}
+
+
+@override_settings(CACHES=THROTTLE_CACHES)
+class AuthenticationTestCase(BaseAPITestCase):
+    """
+    Tests for login identifier resolution and the JWT user cache.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        caches['throttle'].clear()
+        self.client.force_authenticate(user=None)
+
+    def login(self, identifier, password='testpassword'):
+        return self.client.post(reverse('login'), {'identifier': identifier, 'password': password}, format='json')
+
+    def test_find_user_ignores_case_and_prefers_email(self):
+        """
+        Ensure identifiers match usernames and emails in any case, email first.
+        """
+        self.assertEqual(find_user('TestUser'), self.user)
+        self.assertEqual(find_user('TESTUSER@example.com'), self.user)
+        self.assertIsNone(find_user('nobody'))
+
+        # A username equal to another user's email
+        other = User.objects.create_user(username='testuser@example.com', password='x', email='other@example.com')
+        self.assertEqual(find_user('testuser@example.com'), self.user)
+        self.assertEqual(find_user('other@example.com'), other)
+
+        # More username matches than the email match must not hide it
+        for username in ('Shared@Example.com', 'SHARED@example.com'):
+            User.objects.create_user(username=username, password='x')
+        owner = User.objects.create_user(username='owner', password='x', email='shared@example.com')
+        self.assertEqual(find_user('shared@example.com'), owner)
+
+    def test_login_looks_the_user_up_once(self):
+        """
+        Ensure a login reads the user row with a single query.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.login('TESTUSER')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('access', response.data)
+        user_selects = [q for q in queries.captured_queries
+                        if q['sql'].startswith('SELECT') and 'FROM "auth_user"' in q['sql']]
+        self.assertEqual(len(user_selects), 1)
+
+        self.assertEqual(self.login('testuser', 'wrong').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.login('nobody').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_jwt_user_is_cached_until_it_changes(self):
+        """
+        Ensure JWT requests reuse the cached user, and see changes to it.
+        """
+        url = reverse('user_detail')
+        headers = self.get_auth_headers()
+        self.assertEqual(self.client.get(url, **headers).status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            response = self.client.get(url, **headers)
+        self.assertEqual(response.data['first_name'], '')
+
+        self.user.first_name = 'Ada'
+        self.user.save()
+        self.assertEqual(self.client.get(url, **headers).data['first_name'], 'Ada')
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(url, **headers).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_register_hashes_the_password(self):
+        """
+        Ensure registration stores a usable hashed password.
+        """
+        response = self.client.post(reverse('register'), {
+            'username': 'newuser', 'password': 'n3w-passw0rd', 'email': 'New@Example.com',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        user = User.objects.get(username='newuser')
+        self.assertTrue(user.check_password('n3w-passw0rd'))
+        self.assertEqual(user.email, 'New@example.com')
+
+    def test_login_attempts_are_throttled_per_identifier(self):
+        """
+        Ensure an identifier that used up its bucket gets a 429, and others do not.
+        """
+        with mock.patch.object(LoginRateThrottle, 'THROTTLE_RATES', {'login': '2/min'}):
+            self.assertEqual(self.login('testuser', 'wrong').status_code, status.HTTP_401_UNAUTHORIZED)
+            self.assertEqual(self.login('TestUser', 'wrong').status_code, status.HTTP_401_UNAUTHORIZED)
+            response = self.login('testuser')
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertIn('Retry-After', response)
+
+            self.assertEqual(self.login('testuser@example.com').status_code, status.HTTP_200_OK)
+
+    def test_busy_hashing_pool_rejects_logins(self):
+        """
+        Ensure logins are turned away with a 503 when the hashing pool is full.
+        """
+        with mock.patch('api.hashing.pool.run', side_effect=HashingBusy()):
+            response = self.login('testuser')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+
+
+class HashingPoolTestCase(SimpleTestCase):
+    """
+    Tests for the bounded password hashing pool.
+    """
+
+    @override_settings(PASSWORD_HASHING_WORKERS=1, PASSWORD_HASHING_QUEUE=1)
+    def test_admission_control(self):
+        """
+        Ensure work beyond the pool and its queue is rejected, not queued.
+        """
+        pool = HashingPool()
+        release = threading.Event()
+
+        async def scenario():
+            running = asyncio.ensure_future(pool.run(release.wait))
+            queued = asyncio.ensure_future(pool.run(lambda: 'queued'))
+            await asyncio.sleep(0)
+            with self.assertRaises(HashingBusy):
+                await pool.run(lambda: 'rejected')
+            release.set()
+            self.assertEqual(await queued, 'queued')
+            await running
+            # Slots are released when the work finishes
+            self.assertEqual(await pool.run(lambda: 'accepted'), 'accepted')
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            release.set()
+            pool.shutdown()
@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.test import TestCase
+from api.benchmarks import compare, generate_dataset, run_benchmarks
+from api.models import Category, Transaction, TransactionRollup, User
+from api.throttling import LoginRateThrottle
+
+
+class BenchmarkTestCase(TestCase):
+    """
+    Tests for the synthetic data generator and the benchmark command.
+    """
+
+    def test_generate_dataset(self):
+        """
+        Ensure the generator creates users x categories x transactions, with rollups.
+        """
+        users = generate_dataset(users=2, transactions=30, categories=5, batch_size=7)
+        self.assertEqual(len(users), 2)
+        self.assertEqual(Category.objects.filter(user=users[0]).count(), 5)
+        self.assertEqual(Category.objects.filter(user=users[0], parent_category__isnull=False).count(), 2)
+        self.assertEqual(Transaction.objects.filter(user=users[1]).count(), 30)
+        self.assertTrue(TransactionRollup.objects.filter(user=users[1]).exists())
+
+    def test_benchmark_command_writes_results(self):
+        """
+        Ensure the command reports every scenario and rolls back the generated data.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+            call_command('benchmark', users=1, transactions=20, categories=2, iterations=2,
+                         output=output, stdout=StringIO())
+            with open(output) as f:
+                results = json.load(f)
+
+        self.assertEqual(set(results['scenarios']), {
+            'transaction_list', 'transaction_list_filtered', 'transaction_create',
+            'transaction_detail', 'category_list', 'login',
+        })
+        for result in results['scenarios'].values():
+            self.assertLess(result['status'], 300)
+            self.assertGreaterEqual(result['p95_ms'], result['p50_ms'])
+        self.assertFalse(User.objects.filter(username__startswith='bench-user-').exists())
+
+    def test_logins_are_not_throttled(self):
+        """
+        Ensure the login scenario times real logins even beyond the login rate.
+        """
+        user = generate_dataset(users=1, transactions=5, categories=2)[0]
+        with mock.patch.object(LoginRateThrottle, 'THROTTLE_RATES', {'login': '1/min'}):
+            for _ in range(2):
+                results = run_benchmarks(user, iterations=2, scenarios=['login'])
+                self.assertEqual(results['login']['status'], 200)
+
+    def test_compare_reports_regressions(self):
+        """
+        Ensure only metrics that got noticeably worse are reported.
+        """
+        baseline = {'scenarios': {'category_list': {'p50_ms': 10.0, 'p95_ms': 20.0, 'queries': 2}}}
+        results = {'scenarios': {'category_list': {'p50_ms': 10.4, 'p95_ms': 30.0, 'queries': 3}}}
+        self.assertEqual(compare(results, baseline), [
+            ('category_list', 'p95_ms', 20.0, 30.0),
+            ('category_list', 'queries', 2, 3),
+        ])
@@ -0,0 +1,156 @@
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+from rest_framework import status
+from .base import BaseAPITestCase
+from api.category_tree import get_category_tree
+from api.models import Category, Transaction
+
+
+class CategoryTreeTestCase(BaseAPITestCase):
+    """
+    Tests for the cached per-user category hierarchy.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        # Food > Groceries > Fruit > Apples
+        self.food = Category.objects.create(user=self.user, name="Food")
+        self.groceries = Category.objects.create(user=self.user, name="Groceries", parent_category=self.food)
+        self.fruit = Category.objects.create(user=self.user, name="Fruit", parent_category=self.groceries)
+        self.apples = Category.objects.create(user=self.user, name="Apples", parent_category=self.fruit)
+        self.rent = Category.objects.create(user=self.user, name="Rent")
+
+    def test_ancestors_and_descendants(self):
+        """
+        Ensure the tree answers ancestry questions from a single load.
+        """
+        with self.assertNumQueries(1):
+            tree = get_category_tree(self.user.id)
+        self.assertEqual(tree.ancestors(self.apples.id), (self.fruit.id, self.groceries.id, self.food.id))
+        self.assertEqual(tree.depth(self.food.id), 0)
+        self.assertEqual(tree.depth(self.apples.id), 3)
+        self.assertTrue(tree.is_ancestor(self.food.id, self.apples.id))
+        self.assertFalse(tree.is_ancestor(self.rent.id, self.apples.id))
+        self.assertEqual(tree.subtree_ids(self.groceries.id), [self.groceries.id, self.fruit.id, self.apples.id])
+
+    def test_tree_is_cached_and_invalidated(self):
+        """
+        Ensure the tree is served from the cache until a category changes.
+        """
+        get_category_tree(self.user.id)
+        with self.assertNumQueries(0):
+            get_category_tree(self.user.id)
+
+        self.rent.parent_category = self.food
+        self.rent.save()
+        self.assertIn(self.rent.id, get_category_tree(self.user.id).descendants(self.food.id))
+
+    def test_clean_rejects_cycles_and_deep_hierarchies(self):
+        """
+        Ensure cycle and depth checks hold and read the chain with a single query.
+        """
+        self.food.parent_category = self.apples
+        with self.assertRaises(ValidationError) as error:
+            self.food.clean()
+        self.assertIn('Circular reference', str(error.exception))
+
+        bananas = Category(user=self.user, name="Bananas", parent_category=self.apples)
+        bananas.clean()
+        bananas.save()
+        deeper = Category(user=self.user, name="Ripe", parent_category=bananas)
+        with self.assertRaises(ValidationError) as error:
+            deeper.clean()
+        self.assertIn('too deep', str(error.exception))
+
+        with self.assertNumQueries(1):
+            Category(user=self.user, name="Pears", parent_category=self.fruit).clean()
+        get_category_tree(self.user.id)
+        with self.assertNumQueries(0):
+            str(self.apples)
+
+    def test_stale_tree_cannot_let_a_cycle_in(self):
+        """
+        Ensure writes are validated against the database, not a cached tree.
+        """
+        get_category_tree(self.user.id)
+        # A change the cached tree has not seen, as if made through another worker
+        Category.objects.filter(pk=self.rent.pk).update(parent_category=self.apples)
+
+        self.food.parent_category = self.rent
+        with self.assertRaises(ValidationError) as error:
+            self.food.clean()
+        self.assertIn('Circular reference', str(error.exception))
+
+    def test_stale_tree_is_rebuilt_for_unknown_categories(self):
+        """
+        Ensure a category missing from a cached tree is looked up before a 404.
+        """
+        get_category_tree(self.user.id)
+        Category.objects.bulk_create([Category(user=self.user, name="Travel")])
+        travel = Category.objects.get(user=self.user, name="Travel")
+
+        response = self.client.get(reverse('category-totals', kwargs={'pk': travel.id}), format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'Travel')
+
+    def test_transactions_in_category_subtree(self):
+        """
+        Ensure `include_subcategories` lists transactions of the whole subtree.
+        """
+        for category in (self.food, self.apples, self.rent):
+            Transaction.objects.create(
+                user=self.user,
+                user_category=category,
+                amount=Decimal('1.00'),
+                is_expense=True,
+                notes=category.name
+            )
+        url = reverse('transaction-list') + f'?category_type_model=category&category_id={self.groceries.id}'
+
+        response = self.client.get(url, format='json')
+        self.assertEqual(response.data['results'], [])
+        response = self.client.get(url + '&include_subcategories=true', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([t['notes'] for t in response.data['results']], ['Apples'])
+
+    def test_category_totals_roll_up_subtree(self):
+        """
+        Ensure the totals endpoint sums the whole subtree in a single query.
+        """
+        for category, amount, is_expense in (
+            (self.groceries, '10.00', True),
+            (self.apples, '2.50', True),
+            (self.fruit, '4.00', False),
+            (self.food, '100.00', True),
+            (self.rent, '50.00', True),
+        ):
+            Transaction.objects.create(
+                user=self.user, user_category=category, amount=Decimal(amount), is_expense=is_expense
+            )
+        url = reverse('category-totals', kwargs={'pk': self.groceries.id})
+
+        get_category_tree(self.user.id)
+        with self.assertNumQueries(1):
+            response = self.client.get(url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_expenses'], '12.50')
+        self.assertEqual(response.data['total_income'], '4.00')
+        self.assertEqual(response.data['net_balance'], '-8.50')
+        self.assertEqual(response.data['expense_count'], 2)
+        self.assertEqual(
+            [(c['name'], c['total_expenses'], c['total_income']) for c in response.data['categories']],
+            [('Groceries', '10.00', '0.00'), ('Fruit', '0.00', '4.00'), ('Apples', '2.50', '0.00')],
+        )
+
+    def test_category_totals_of_another_user(self):
+        """
+        Ensure totals are not exposed for someone else's category.
+        """
+        other = User.objects.create_user(username='other', password='otherpassword')
+        category = Category.objects.create(user=other, name="Other")
+        response = self.client.get(reverse('category-totals', kwargs={'pk': category.id}), format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,96 @@
+import time
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from .base import BaseAPITestCase
+from api.models import Category, Transaction
+
+
+class ConditionalListTestCase(BaseAPITestCase):
+    """
+    Tests for ETag/Last-Modified validation of the transaction and category lists.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.food = Category.objects.create(user=self.user, name="Food")
+        self.coffee = Transaction.objects.create(
+            user=self.user, user_category=self.food, is_expense=True, amount=Decimal('3.50')
+        )
+        self.transactions_url = reverse('transaction-list')
+        self.categories_url = reverse('category-list-create')
+
+    def test_unchanged_list_is_not_modified_with_one_query(self):
+        """
+        Ensure a matching If-None-Match gets a 304 after only the version lookup.
+        """
+        for url in (self.transactions_url, self.categories_url):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn('private', response['Cache-Control'])
+
+            with self.assertNumQueries(1):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response.content, b'')
+
+    def test_writes_change_the_etag(self):
+        """
+        Ensure creating, updating or deleting a transaction or category
+        invalidates the validators of both lists.
+        """
+        writes = [
+            lambda: Transaction.objects.create(
+                user=self.user, user_category=self.food, is_expense=True, amount=Decimal('9.00')
+            ),
+            lambda: self.coffee.soft_delete(),
+            lambda: Category.objects.create(user=self.user, name="Rent"),
+        ]
+        for write in writes:
+            etags = [self.client.get(url)['ETag'] for url in (self.transactions_url, self.categories_url)]
+            write()
+            for url, etag in zip((self.transactions_url, self.categories_url), etags):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_etag_depends_on_filters_and_user(self):
+        """
+        Ensure different filters, and other users, get different ETags.
+        """
+        etag = self.client.get(self.transactions_url)['ETag']
+        filtered = self.client.get(self.transactions_url, {'is_expense': 'true'})
+        self.assertNotEqual(filtered['ETag'], etag)
+
+        other = User.objects.create_user(username='other', password='testpassword')
+        self.client.force_authenticate(user=other)
+        response = self.client.get(self.transactions_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_if_modified_since(self):
+        """
+        Ensure Last-Modified can be used as a validator too, but only once the
+        second of the last write is over.
+        """
+        # A write in this same second could still follow
+        self.assertNotIn('Last-Modified', self.client.get(self.categories_url))
+
+        later = time.time() + 2
+        with mock.patch('api.user_data.time.time', return_value=later):
+            response = self.client.get(self.categories_url)
+            response = self.client.get(self.categories_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_validators_are_shared_by_workers(self):
+        """
+        Ensure the validators come from the database, not a per-process cache.
+        """
+        etag = self.client.get(self.transactions_url)['ETag']
+        # The cache of this process misses the write, as another worker's would
+        with mock.patch('django.core.cache.cache.set'), mock.patch('django.core.cache.cache.incr'):
+            Transaction.objects.create(
+                user=self.user, user_category=self.food, is_expense=True, amount=Decimal('9.00')
+            )
+        response = self.client.get(self.transactions_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
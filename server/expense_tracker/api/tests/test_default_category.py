@@ -0,0 +1,118 @@
+import time
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from api.default_categories import DefaultCategory
+from api.models import Category, Transaction
+from api.resolvers import MAX_AGE, DefaultCategoryResolver
+from api.views import default_category
+
+
+class DefaultCategoryAPITestCase(APITestCase):
+    """
+    Tests for the cached default category list.
+    """
+
+    def setUp(self):
+        cache.clear()
+        DefaultCategory.populate_defaults()
+        self.url = reverse('category-default-list')
+
+    def test_list_is_cached(self):
+        """
+        Ensure repeated requests are served from the cache.
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), DefaultCategory.objects.filter(is_active=True).count())
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.url)
+        self.assertEqual(cached.data, response.data)
+
+    def test_if_none_match_returns_304(self):
+        """
+        Ensure a client holding the current ETag gets a 304.
+        """
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_changes_invalidate_the_cache(self):
+        """
+        Ensure saving or deleting a default category refreshes the list and its ETag.
+        """
+        etag = self.client.get(self.url)['ETag']
+
+        category = DefaultCategory.objects.create(name="Pets", is_expense=True)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Pets", [c['name'] for c in response.data])
+
+        category.delete()
+        response = self.client.get(self.url)
+        self.assertNotIn("Pets", [c['name'] for c in response.data])
+
+
+    def test_list_expires_without_a_version_bump(self):
+        """
+        Ensure a worker that missed the version bump serves the new list after MAX_AGE.
+        """
+        self.client.get(self.url)
+        # A change handled by another worker, with a cache of its own
+        with mock.patch('api.signals.bump_version'):
+            DefaultCategory.objects.create(name="Pets", is_expense=True)
+        self.assertNotIn("Pets", [c['name'] for c in self.client.get(self.url).data])
+
+        later = time.time() + default_category.MAX_AGE + 1
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=later):
+            self.assertIn("Pets", [c['name'] for c in self.client.get(self.url).data])
+
+
+class DefaultCategoryResolverTestCase(APITestCase):
+    """
+    Tests for the per-process default category map.
+    """
+
+    def setUp(self):
+        cache.clear()
+        DefaultCategory.populate_defaults()
+
+    def test_map_expires_without_a_version_bump(self):
+        """
+        Ensure a worker that missed the version bump reloads its map after MAX_AGE.
+        """
+        resolver = DefaultCategoryResolver()
+        category = DefaultCategory.objects.first()
+        self.assertEqual(resolver.get(category.id).name, category.name)
+
+        # Changed behind the resolver's back, as a write in another worker would be
+        DefaultCategory.objects.filter(pk=category.pk).update(name='Renamed')
+        self.assertEqual(resolver.get(category.id).name, category.name)
+        with mock.patch('api.resolvers.time.monotonic', return_value=resolver._loaded_at + MAX_AGE):
+            self.assertEqual(resolver.get(category.id).name, 'Renamed')
+
+
+class TransactionValidationTestCase(APITestCase):
+    """
+    Tests for the validation run when saving a transaction.
+    """
+
+    def test_loaded_relations_still_check_constraints(self):
+        """
+        Ensure loaded categories skip the existence query but not the constraints.
+        """
+        user = User.objects.create_user(username='owner', password='x')
+        category = Category.objects.create(user=user, name='Food')
+        default = DefaultCategory.objects.create(name='Misc', is_expense=True)
+        transaction = Transaction(user=user, user_category=category, default_category=default,
+                                  is_expense=True, amount=Decimal('1.00'))
+        with self.assertRaises(ValidationError) as raised:
+            transaction.save()
+        self.assertIn('transaction_single_category', str(raised.exception))
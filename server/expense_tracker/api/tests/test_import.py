@@ -0,0 +1,151 @@
+from decimal import Decimal
+from functools import partial
+from unittest import mock
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework import status
+from .base import BaseAPITestCase
+from api.models import Category, Transaction
+from api.default_categories import DefaultCategory
+from api.importers import import_statement
+from api.rollups import find_drift
+
+
+CSV_STATEMENT = b"""Date,Description,Amount,Category
+2025-08-01,Supermarket,-45.10,Groceries
+2025-08-01,Coffee,-3.50,
+2025-08-01,Coffee,-3.50,
+2025-08-02,ACME payroll,2500.00,Salary
+"""
+
+OFX_STATEMENT = b"""OFXHEADER:100
+DATA:OFXSGML
+
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250803120000<TRNAMT>-12.00<NAME>Cinema<MEMO>Tickets</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20250804<TRNAMT>100.00<NAME>Refund</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+class TransactionImportAPITestCase(BaseAPITestCase):
+    """
+    Tests for importing bank statements.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.groceries = Category.objects.create(user=self.user, name="Groceries", is_expense=True)
+        self.other_expenses = DefaultCategory.objects.create(name="Other Expenses", is_expense=True)
+        self.salary = DefaultCategory.objects.create(name="Salary", is_expense=False)
+
+    def upload(self, name, content):
+        url = reverse('transaction-import')
+        return self.client.post(url, {'file': SimpleUploadedFile(name, content)}, format='multipart')
+
+    def test_import_csv(self):
+        """
+        Ensure CSV rows are created with their dates and mapped categories.
+        """
+        response = self.upload('statement.csv', CSV_STATEMENT)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 4)
+        supermarket = Transaction.objects.get(notes='Supermarket')
+        self.assertTrue(supermarket.is_expense)
+        self.assertEqual(supermarket.amount, Decimal('45.10'))
+        self.assertEqual(supermarket.user_category, self.groceries)
+        self.assertEqual(supermarket.created_at.date().isoformat(), '2025-08-01')
+        self.assertEqual(Transaction.objects.filter(notes='Coffee', default_category=self.other_expenses).count(), 2)
+        self.assertEqual(Transaction.objects.get(notes='ACME payroll').default_category, self.salary)
+        self.assertEqual(find_drift(), {})
+
+    def test_reimport_skips_duplicates(self):
+        """
+        Ensure importing the same statement twice does not duplicate rows.
+        """
+        self.upload('statement.csv', CSV_STATEMENT)
+        response = self.upload('statement.csv', CSV_STATEMENT)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 0)
+        self.assertEqual(response.data['duplicates'], 4)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 4)
+
+    def test_import_ofx(self):
+        """
+        Ensure OFX (SGML) statements are parsed.
+        """
+        response = self.upload('statement.ofx', OFX_STATEMENT)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+        cinema = Transaction.objects.get(notes='Cinema Tickets')
+        self.assertEqual(cinema.amount, Decimal('12.00'))
+        self.assertTrue(cinema.is_expense)
+        self.assertFalse(Transaction.objects.get(notes='Refund').is_expense)
+
+    def test_import_invalid_file(self):
+        """
+        Ensure unsupported or malformed statements are rejected.
+        """
+        response = self.upload('statement.pdf', b'%PDF')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.upload('statement.csv', b'foo,bar\n1,2\n')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_ofx_with_a_bad_date(self):
+        """
+        Ensure a malformed OFX date is a 400 naming the transaction, and imports nothing.
+        """
+        statement = OFX_STATEMENT.replace(b'<DTPOSTED>20250804', b'<DTPOSTED>2025-8')
+        response = self.upload('statement.ofx', statement)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['file'], ["OFX transaction 2: Unrecognized date '2025-8'."])
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
+
+    def test_unsorted_duplicates_and_oversized_amounts(self):
+        """
+        Ensure identical rows on the same date are told apart wherever they
+        appear, and amounts too large to store are counted as invalid.
+        """
+        statement = (b"Date,Description,Amount\n"
+                     b"2025-08-01,Coffee,-3.50\n"
+                     b"2025-08-02,Bus,-1.20\n"
+                     b"2025-08-01,Coffee,-3.50\n"
+                     b"2025-08-03,Lottery,123456789.00\n")
+        response = self.upload('statement.csv', statement)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(response.data['invalid'], 1)
+        self.assertEqual(Transaction.objects.filter(notes='Coffee').count(), 2)
+
+    def test_failed_import_writes_nothing(self):
+        """
+        Ensure an error in a later row rolls back the batches written before it.
+        """
+        statement = CSV_STATEMENT + b"someday,Broken,-1.00\n"
+        with mock.patch('api.views.transaction.import_statement', partial(import_statement, batch_size=1)):
+            response = self.upload('statement.csv', statement)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
+
+    def test_dates_coming_back_after_their_counts_are_dropped(self):
+        """
+        Ensure a posting date reappearing after more than OPEN_DATES other dates is rejected.
+        """
+        statement = (b"Date,Description,Amount\n"
+                     b"2025-08-01,Coffee,-3.50\n"
+                     b"2025-08-02,Bus,-1.20\n"
+                     b"2025-08-03,Bus,-1.20\n"
+                     b"2025-08-01,Coffee,-3.50\n")
+        with mock.patch('api.importers.OPEN_DATES', 2):
+            response = self.upload('statement.csv', statement)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('2025-08-01', response.data['file'][0])
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
@@ -0,0 +1,55 @@
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from .base import BaseAPITestCase
+from api.metrics import registry
+from api.models import Category
+
+
+class MetricsTestCase(BaseAPITestCase):
+    """
+    Tests for the request metrics middleware and the /metrics endpoint.
+    """
+
+    def setUp(self):
+        super().setUp()
+        registry.clear()
+        Category.objects.create(user=self.user, name="Groceries")
+
+    @override_settings(METRICS_SAMPLE_RATE=1.0)
+    def test_sampled_request_reports_server_timing(self):
+        """
+        Ensure sampled requests get a Server-Timing header and per-endpoint metrics.
+        """
+        response = self.client.get(reverse('category-list-create'), format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", render;dur=[\d.]+, total;dur=[\d.]+$')
+
+        metrics = self.client.get(reverse('metrics')).content.decode()
+        labels = 'method="GET",route="/api/categories/",status="200"'
+        self.assertIn(f'http_request_duration_seconds_count{{{labels}}} 1', metrics)
+        self.assertIn(f'http_requests_sampled_total{{{labels}}} 1', metrics)
+        self.assertRegex(metrics, rf'http_request_db_queries_total{{{labels}}} [1-9]')
+
+    @override_settings(METRICS_SAMPLE_RATE=0.0)
+    def test_unsampled_request_only_records_latency(self):
+        """
+        Ensure requests outside the sample are counted without extra instrumentation.
+        """
+        response = self.client.get(reverse('category-list-create'), format='json')
+        self.assertNotIn('Server-Timing', response)
+
+        metrics = self.client.get(reverse('metrics')).content.decode()
+        labels = 'method="GET",route="/api/categories/",status="200"'
+        self.assertIn(f'http_request_duration_seconds_count{{{labels}}} 1', metrics)
+        self.assertIn(f'http_requests_sampled_total{{{labels}}} 0', metrics)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        """
+        Ensure /metrics requires the configured bearer token.
+        """
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
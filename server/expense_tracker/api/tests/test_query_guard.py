@@ -0,0 +1,61 @@
+from decimal import Decimal
+from unittest import mock
+from django.urls import reverse
+from .base import BaseAPITestCase
+from api.models import Category, Transaction
+from api.query_guard import QueryBudgetExceeded, normalize_sql, query_budget
+from api.views.transaction import TransactionListAPIView
+
+
+class QueryGuardTestCase(BaseAPITestCase):
+    """
+    Tests for the query budget context manager and middleware.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.categories = [Category.objects.create(user=self.user, name=f"Category {i}") for i in range(5)]
+        for category in self.categories:
+            Transaction.objects.create(user=self.user, user_category=category, amount=Decimal('1.00'), is_expense=True)
+
+    def test_normalize_sql(self):
+        """
+        Ensure statements differing only by their parameters normalize to the same text.
+        """
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id = 12 AND name = 'it''s' AND x IN (1, 2, 3)"),
+            "SELECT * FROM t WHERE id = ? AND name = ? AND x IN (?)",
+        )
+
+    def test_query_budget_flags_repeated_queries(self):
+        """
+        Ensure an N+1 loop is reported even when the total count is within budget.
+        """
+        with self.assertRaises(QueryBudgetExceeded) as error:
+            with query_budget(10):
+                [t.user_category.name for t in Transaction.objects.all()]
+        self.assertIn('Same query run 5 times', str(error.exception))
+
+        with query_budget(1):
+            [t.user_category.name for t in Transaction.objects.select_related('user_category')]
+
+    def test_query_budget_counts_queries(self):
+        """
+        Ensure going over the declared number of queries fails.
+        """
+        with self.assertRaises(QueryBudgetExceeded) as error:
+            with query_budget(1, max_repeats=None):
+                list(Category.objects.all())
+                list(Transaction.objects.all())
+        self.assertIn('2 queries run, budget is 1', str(error.exception))
+
+    def test_middleware_enforces_view_budget(self):
+        """
+        Ensure requests to API views fail when they exceed the view's budget.
+        """
+        url = reverse('transaction-list')
+        self.client.get(url, format='json')
+        with mock.patch.object(TransactionListAPIView, 'query_budget', 0):
+            with self.assertRaises(QueryBudgetExceeded):
+                # A new query: the first one is now served from the response cache
+                self.client.get(url, {'is_expense': 'true'}, format='json')
@@ -0,0 +1,50 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import mock
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from api import renderer
+from api.renderer import CustomResponseRenderer, FastJSONRenderer
+
+
+class FastJSONRendererTestCase(SimpleTestCase):
+    """
+    Tests for the orjson-backed renderers and their stdlib fallback.
+    """
+
+    data = {
+        'next': None,
+        'results': [
+            {'id': 1, 'amount': Decimal('12.50'), 'notes': 'Café', 'is_expense': True,
+             'created_at': datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)},
+        ],
+        7: 'non-string key',
+    }
+
+    def test_matches_drf_output(self):
+        """
+        Ensure both encoders match DRF's JSONRenderer, except for keeping Decimals exact.
+        """
+        expected = json.loads(JSONRenderer().render(self.data))
+        expected['results'][0]['amount'] = '12.50'  # DRF would write a float
+        rendered = FastJSONRenderer().render(self.data)
+        self.assertEqual(json.loads(rendered), expected)
+        self.assertIn('Café'.encode(), rendered)
+
+        with mock.patch.object(renderer, 'orjson', None):
+            self.assertEqual(json.loads(FastJSONRenderer().render(self.data)), expected)
+
+    def test_custom_response_envelope(self):
+        """
+        Ensure the success/error envelope is written around the encoded body.
+        """
+        def render(data, status_code):
+            return json.loads(CustomResponseRenderer().render(
+                data, 'application/json', {'response': Response(status=status_code)}
+            ))
+
+        self.assertEqual(render({'id': 1}, 201), {'success': True, 'data': {'id': 1}})
+        self.assertEqual(render({'amount': ['Required.']}, 400),
+                         {'success': False, 'error_details': {'amount': ['Required.']}})
@@ -0,0 +1,157 @@
+from contextlib import contextmanager
+from decimal import Decimal
+from unittest import mock
+from django.http import QueryDict
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from .base import BaseAPITestCase
+from api.models import Category, Transaction
+from api.response_cache import ResponseCache, normalize_params, transaction_lists
+
+
+class ResponseCacheTestCase(SimpleTestCase):
+    """
+    Tests for the in-process LRU response cache.
+    """
+
+    def test_normalize_params(self):
+        """
+        Ensure parameter order and empty values do not change the key.
+        """
+        self.assertEqual(
+            normalize_params(QueryDict('is_expense=true&category_id=3&search=')),
+            normalize_params(QueryDict('category_id=3&is_expense=true')),
+        )
+
+    def test_stale_versions_are_misses(self):
+        """
+        Ensure an entry is only served for the version it was stored at.
+        """
+        cache = ResponseCache()
+        cache.set(1, 'v1', 'key', {'results': []}, 10)
+        self.assertEqual(cache.get(1, 'v1', 'key'), {'results': []})
+        self.assertIsNone(cache.get(1, 'v2', 'key'))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.size, 0)
+
+    def test_new_version_drops_older_entries(self):
+        """
+        Ensure storing an entry frees the user's entries for older versions.
+        """
+        cache = ResponseCache()
+        cache.set(1, 'v1', 'a', 'A', 10)
+        cache.set(2, 'v1', 'a', 'A', 10)
+        cache.set(1, 'v2', 'b', 'B', 10)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.size, 20)
+        self.assertEqual(cache.get(2, 'v1', 'a'), 'A')
+
+    @override_settings(TRANSACTION_CACHE_USER_ENTRIES=2, TRANSACTION_CACHE_MAX_BYTES=1600)
+    def test_lru_eviction(self):
+        """
+        Ensure the per-user and total limits evict the least recently used entries.
+        """
+        cache = ResponseCache()
+        cache.set(1, 'v', 'a', 'A', 10)
+        cache.set(1, 'v', 'b', 'B', 10)
+        cache.get(1, 'v', 'a')
+        cache.set(1, 'v', 'c', 'C', 10)
+        self.assertIsNone(cache.get(1, 'v', 'b'))
+        self.assertEqual(cache.get(1, 'v', 'a'), 'A')
+
+        # 100 bytes is the largest entry allowed; the total is 1600
+        cache.set(2, 'v', 'big', 'X', 101)
+        self.assertIsNone(cache.get(2, 'v', 'big'))
+        for user_id in range(3, 20):
+            cache.set(user_id, 'v', 'k', 'Y', 100)
+        self.assertLessEqual(cache.size, 1600)
+        self.assertIsNone(cache.get(1, 'v', 'a'))
+        self.assertEqual(cache.get(19, 'v', 'k'), 'Y')
+
+
+class TransactionListCacheTestCase(BaseAPITestCase):
+    """
+    Tests for serving repeated transaction list queries from the response cache.
+    """
+
+    def setUp(self):
+        super().setUp()
+        transaction_lists.clear()
+        self.food = Category.objects.create(user=self.user, name="Food")
+        self.coffee = Transaction.objects.create(
+            user=self.user, user_category=self.food, is_expense=True, amount=Decimal('3.50'), notes="Coffee"
+        )
+        self.url = reverse('transaction-list')
+
+    def test_repeated_query_only_reads_the_version(self):
+        """
+        Ensure a repeated filter combination is served after the version lookup alone.
+        """
+        first = self.client.get(self.url, {'is_expense': 'true', 'category_id': self.food.id,
+                                           'category_type_model': 'category'})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(1):
+            second = self.client.get(f'{self.url}?category_type_model=category'
+                                     f'&category_id={self.food.id}&is_expense=true')
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+
+    def test_writes_invalidate_cached_lists(self):
+        """
+        Ensure creating, updating and deleting through the API is reflected at once.
+        """
+        self.client.get(self.url)
+        response = self.client.post(reverse('transaction-create'), {
+            'category_type_model': 'Category',
+            'category_id': self.food.id,
+            'amount': '9.00',
+            'is_expense': True,
+            'notes': 'Lunch',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        lunch_id = response.data['id']
+        self.assertEqual([t['notes'] for t in self.client.get(self.url).data['results']], ['Lunch', 'Coffee'])
+
+        detail = reverse('transaction-detail', kwargs={'pk': self.coffee.id})
+        response = self.client.put(detail, {
+            'category_type_model': 'Category',
+            'category_id': self.food.id,
+            'amount': '3.50',
+            'is_expense': True,
+            'notes': 'Espresso',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([t['notes'] for t in self.client.get(self.url).data['results']], ['Lunch', 'Espresso'])
+
+        self.client.delete(reverse('transaction-detail', kwargs={'pk': lunch_id}))
+        self.assertEqual([t['id'] for t in self.client.get(self.url).data['results']], [self.coffee.id])
+
+    def test_writes_through_another_worker_are_seen(self):
+        """
+        Ensure a worker does not serve a list cached before another worker's write.
+        """
+        # Each worker has its own response cache and its own locmem cache
+        @contextmanager
+        def worker(name, responses):
+            caches = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': name}}
+            with override_settings(CACHES=caches), mock.patch('api.views.transaction.transaction_lists', responses):
+                yield
+
+        worker_a, worker_b = ResponseCache(), ResponseCache()
+        with worker('worker-a', worker_a):
+            self.assertEqual([t['notes'] for t in self.client.get(self.url).data['results']], ['Coffee'])
+
+        with worker('worker-b', worker_b):
+            self.client.get(self.url)
+            response = self.client.post(reverse('transaction-create'), {
+                'category_type_model': 'Category',
+                'category_id': self.food.id,
+                'amount': '9.00',
+                'is_expense': True,
+                'notes': 'Lunch',
+            }, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        with worker('worker-a', worker_a):
+            self.assertEqual([t['notes'] for t in self.client.get(self.url).data['results']], ['Lunch', 'Coffee'])
@@ -0,0 +1,173 @@
+from datetime import datetime
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from .base import BaseAPITestCase
+from api import timeseries
+from api.default_categories import DefaultCategory
+from api.filters import filter_transactions
+from api.models import Category, Transaction, TransactionRollup, User
+from api.rollups import find_drift
+from api.totals import grouped_totals, summarize
+
+
+class TransactionRollupTestCase(TestCase):
+    """
+    Tests for the incrementally maintained transaction rollups.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.category = Category.objects.create(user=self.user, name="Groceries", is_expense=True)
+
+    def create_transaction(self, amount):
+        return Transaction.objects.create(
+            user=self.user,
+            user_category=self.category,
+            amount=Decimal(amount),
+            is_expense=True,
+        )
+
+    def get_rollup(self, granularity):
+        period = timezone.localdate()
+        if granularity == TransactionRollup.MONTH:
+            period = period.replace(day=1)
+        return TransactionRollup.objects.get(user=self.user, granularity=granularity, period=period)
+
+    def test_create_update_and_soft_delete(self):
+        """
+        Ensure creates, updates and soft deletes are reflected in the day and month rows.
+        """
+        first = self.create_transaction('10.00')
+        self.create_transaction('5.50')
+
+        for granularity in (TransactionRollup.DAY, TransactionRollup.MONTH):
+            rollup = self.get_rollup(granularity)
+            self.assertEqual(rollup.total, Decimal('15.50'))
+            self.assertEqual(rollup.count, 2)
+
+        first.amount = Decimal('20.00')
+        first.save()
+        self.assertEqual(self.get_rollup(TransactionRollup.DAY).total, Decimal('25.50'))
+
+        first.soft_delete()
+        rollup = self.get_rollup(TransactionRollup.MONTH)
+        self.assertEqual(rollup.total, Decimal('5.50'))
+        self.assertEqual(rollup.count, 1)
+        self.assertEqual(find_drift(), {})
+
+    def test_rebuild_command_repairs_drift(self):
+        """
+        Ensure --check detects drift and a rebuild fixes it.
+        """
+        self.create_transaction('10.00')
+        TransactionRollup.objects.all().update(total=Decimal('99.00'))
+        self.assertNotEqual(find_drift(), {})
+
+        call_command('rebuild_rollups', stdout=StringIO())
+
+        self.assertEqual(find_drift(), {})
+        self.assertEqual(self.get_rollup(TransactionRollup.DAY).total, Decimal('10.00'))
+
+
+class RollupReadsTestCase(BaseAPITestCase):
+    """
+    Tests for the summary, timeseries and category totals read from the rollups.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.food = Category.objects.create(user=self.user, name="Food", is_expense=True)
+        self.snacks = Category.objects.create(user=self.user, name="Snacks", is_expense=True,
+                                              parent_category=self.food)
+        self.salary = DefaultCategory.objects.create(name="Salary", is_expense=False)
+        utc = timezone.get_fixed_timezone(0)
+        for (month, day, hour), amount, category in [
+            ((1, 15, 12), '10.00', {'user_category': self.food}),
+            ((1, 31, 23), '2.50', {'user_category': self.snacks}),
+            ((2, 1, 0), '4.00', {'user_category': self.snacks}),
+            ((2, 14, 12), '100.00', {'default_category': self.salary}),
+            ((3, 2, 12), '7.25', {}),
+            ((3, 31, 12), '1.00', {'user_category': self.food}),
+            ((4, 1, 12), '3.00', {'user_category': self.snacks}),
+        ]:
+            Transaction.objects.create(
+                user=self.user, amount=Decimal(amount), is_expense='default_category' not in category,
+                created_at=datetime(2025, month, day, hour, tzinfo=utc), **category,
+            )
+        Transaction.objects.create(user=self.user, user_category=self.food, amount=Decimal('50.00'),
+                                   is_expense=True, created_at=datetime(2025, 2, 20, tzinfo=utc)).soft_delete()
+
+    def get_reading(self, url):
+        """
+        Returns the response to `url` and whether it read the transactions table.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response, any('"api_transaction"' in q['sql'] for q in queries.captured_queries)
+
+    def transactions(self, query):
+        queryset = Transaction.objects.filter(user=self.user, deleted_at__isnull=True)
+        return filter_transactions(queryset, QueryDict(query), self.user)
+
+    def test_summary_matches_the_transactions(self):
+        """
+        Ensure the summary read from the rollups equals the totals of the transactions.
+        """
+        for query in ['', 'date=2025', 'date=02-2025', 'date=31-01-2025', 'from=2025-01-20&to=2025-03-05',
+                      'from=2025-01-31', 'to=2025-02-28', 'from=2025-02-01&to=2025-03-31',
+                      'date=2025&from=2025-01-16&to=2025-03-31', 'is_expense=false',
+                      f'category_type_model=category&category_id={self.food.id}&include_subcategories=true'
+                      '&from=2025-01-31&to=2025-04-01']:
+            with self.subTest(query=query):
+                response, scanned = self.get_reading(reverse('transaction-summary') + '?' + query)
+                self.assertFalse(scanned)
+                self.assertEqual(response.data, summarize(grouped_totals(self.transactions(query))))
+
+    def test_timeseries_matches_the_transactions(self):
+        """
+        Ensure daily, weekly and monthly series read from the rollups equal the transactions'.
+        """
+        tz = timezone.get_default_timezone()
+        for window, filters in [('interval=day&from=2025-01-25&to=2025-02-20', ''),
+                                ('interval=week&from=2025-01-01&to=2025-04-30', ''),
+                                ('interval=month&from=2025-01-10&to=2025-04-01', 'is_expense=true')]:
+            with self.subTest(window=window, filters=filters):
+                response, scanned = self.get_reading(f"{reverse('transaction-timeseries')}?{window}&{filters}")
+                self.assertFalse(scanned)
+                interval, buckets = timeseries.window(QueryDict(window), tz)
+                expected = timeseries.build_timeseries(self.transactions(filters), interval, buckets, tz)
+                self.assertEqual(response.data, expected)
+
+    def test_category_totals_read_the_rollups(self):
+        """
+        Ensure category totals come from the rollups and cover the subtree.
+        """
+        response, scanned = self.get_reading(reverse('category-totals', kwargs={'pk': self.food.pk}) + '?date=2025')
+        self.assertFalse(scanned)
+        self.assertEqual(response.data['total_expenses'], '20.50')
+        self.assertEqual([c['total_expenses'] for c in response.data['categories']], ['11.00', '9.50'])
+
+    def test_other_time_zones_and_searches_read_the_transactions(self):
+        """
+        Ensure filters the rollups cannot answer fall back to the transactions.
+        """
+        for url in [reverse('transaction-summary') + '?date=02-2025&tz=America/Bogota',
+                    reverse('transaction-summary') + '?search=salary',
+                    reverse('transaction-timeseries') + '?interval=month&from=2025-01-01&to=2025-04-30&tz=Asia/Tokyo',
+                    reverse('category-totals', kwargs={'pk': self.food.pk}) + '?date=2025&tz=Asia/Tokyo']:
+            with self.subTest(url=url):
+                _, scanned = self.get_reading(url)
+                self.assertTrue(scanned)
+
+        response, _ = self.get_reading(reverse('transaction-summary') + '?date=02-2025&tz=America/Bogota')
+        # 2025-02-01 00:00 UTC is still January in Bogota
+        self.assertEqual(response.data['expense_count'], 0)
+        self.assertEqual(response.data['income_count'], 1)
@@ -0,0 +1,111 @@
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework import status
+from .base import BaseAPITestCase
+from api.models import Category, Transaction
+
+
+class SyncAPITestCase(BaseAPITestCase):
+    """
+    Tests for the delta sync endpoint.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.food = Category.objects.create(user=self.user, name="Food")
+        self.coffee = Transaction.objects.create(
+            user=self.user, user_category=self.food, is_expense=True, amount=Decimal('3.50'), notes="Coffee"
+        )
+        self.url = reverse('sync')
+
+    def sync(self, since=None, **params):
+        if since is not None:
+            params['since'] = since
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_full_snapshot_then_nothing_new(self):
+        """
+        Ensure a sync without token returns every row, and the returned token
+        yields no changes until something is written.
+        """
+        first = self.sync()
+        self.assertEqual([c['id'] for c in first['categories']], [self.food.id])
+        self.assertEqual([t['id'] for t in first['transactions']], [self.coffee.id])
+        self.assertFalse(first['has_more'])
+
+        second = self.sync(first['token'])
+        self.assertEqual(second['transactions'], [])
+        self.assertEqual(second['categories'], [])
+        self.assertEqual(second['token'], first['token'])
+
+    def test_updates_and_tombstones(self):
+        """
+        Ensure updated rows come back in full and deleted ones as ids only.
+        """
+        token = self.sync()['token']
+        self.coffee.notes = "Espresso"
+        self.coffee.save()
+        rent_id = Category.objects.create(user=self.user, name="Rent").id
+        Category.objects.get(pk=rent_id).delete()
+        lunch = Transaction.objects.create(
+            user=self.user, user_category=self.food, is_expense=True, amount=Decimal('9.00')
+        )
+        lunch.soft_delete()
+
+        changes = self.sync(token)
+        self.assertEqual([t['notes'] for t in changes['transactions']], ["Espresso"])
+        self.assertEqual(changes['categories'], [])
+        self.assertEqual(changes['deleted'], {'transactions': [lunch.id], 'categories': [rent_id]})
+
+    def test_deleting_a_parent_updates_its_subcategories(self):
+        """
+        Ensure subcategories detached by a category delete are synced again.
+        """
+        parent = Category.objects.create(user=self.user, name="Leisure")
+        child = Category.objects.create(user=self.user, name="Cinema", parent_category=parent)
+        token = self.sync()['token']
+        parent_id = parent.id
+        parent.delete()
+
+        changes = self.sync(token)
+        self.assertEqual([(c['id'], c['parent_category']) for c in changes['categories']], [(child.id, None)])
+        self.assertEqual(changes['deleted']['categories'], [parent_id])
+
+    def test_pages_follow_the_token(self):
+        """
+        Ensure `limit` pages through the changes without skipping any.
+        """
+        for amount in range(1, 6):
+            Transaction.objects.create(
+                user=self.user, user_category=self.food, is_expense=True, amount=Decimal(amount)
+            )
+        seen, token, pages = [], None, 0
+        while True:
+            page = self.sync(token, limit=2)
+            seen += [('category', c['id']) for c in page['categories']]
+            seen += [('transaction', t['id']) for t in page['transactions']]
+            token, pages = page['token'], pages + 1
+            if not page['has_more']:
+                break
+        self.assertEqual(pages, 4)
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len(set(seen)), 7)
+
+    def test_other_users_changes_are_not_returned(self):
+        """
+        Ensure the change sequence is per user.
+        """
+        other = User.objects.create_user(username='other', password='testpassword')
+        Category.objects.create(user=other, name="Hidden")
+        changes = self.sync()
+        self.assertEqual([c['name'] for c in changes['categories']], ["Food"])
+
+    def test_invalid_token(self):
+        """
+        Ensure a malformed token is rejected.
+        """
+        response = self.client.get(self.url, {'since': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
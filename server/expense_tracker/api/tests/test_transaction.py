@@ -2,9 +2,16 @@ from django.urls import reverse
 from rest_framework import status
 from .base import BaseAPITestCase
 from api.models import Category, Transaction, User
+from api.default_categories import DefaultCategory
+from api.rollups import find_drift
+from api import timeseries
 from django.utils import timezone
+from datetime import date
 from decimal import Decimal
-from django.contrib.contenttypes.models import ContentType
+from unittest import mock
+import json
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 class TransactionAPITestCase(BaseAPITestCase):
     """
@@ -32,16 +39,14 @@ class TransactionAPITestCase(BaseAPITestCase):
         # Create some initial transactions for listing/retrieval
         self.transaction1 = Transaction.objects.create(
             user=self.user,
-            category_type_model=ContentType.objects.get_for_model(Category),
-            category_id=self.expense_category.id,
+            user_category=self.expense_category,
             amount=Decimal('50.00'),
             is_expense=True,
             notes="Weekly groceries"
         )
         self.transaction2 = Transaction.objects.create(
             user=self.user,
-            category_type_model=ContentType.objects.get_for_model(Category),
-            category_id=self.income_category.id,
+            user_category=self.income_category,
             amount=Decimal('500.00'),
             is_expense=False,
             notes="Freelance work"
@@ -57,8 +62,7 @@ class TransactionAPITestCase(BaseAPITestCase):
         )
         self.other_transaction = Transaction.objects.create(
             user=self.other_user,
-            category_type_model=ContentType.objects.get_for_model(Category),
-            category_id=self.other_category.id,
+            user_category=self.other_category,
             amount=Decimal('20.00'),
             is_expense=True,
             notes="Other's expense"
@@ -69,16 +73,17 @@ class TransactionAPITestCase(BaseAPITestCase):
         """
         Ensure we can list transactions for the authenticated user only.
         """
-        url = reverse('transaction-list-create')
+        url = reverse('transaction-list')
         response = self.client.get(url, format='json')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2) # Should only see transaction1 and transaction2
-        transaction_descriptions = [t['notes'] for t in response.data]
+        results = response.data['results']
+        self.assertEqual(len(results), 2) # Should only see transaction1 and transaction2
+        transaction_descriptions = [t['notes'] for t in results]
         self.assertIn('Weekly groceries', transaction_descriptions)
         self.assertIn('Freelance work', transaction_descriptions)
         self.assertNotIn("Other's expense", transaction_descriptions)
-        self.assertEqual(float(response.data[1]['amount']), 50.00) # Check decimal conversion
+        self.assertEqual(float(results[1]['amount']), 50.00) # Check decimal conversion
 
     def test_list_transactions_with_filters(self):
         """
@@ -87,24 +92,48 @@ class TransactionAPITestCase(BaseAPITestCase):
         # Create an income transaction
         Transaction.objects.create(
             user=self.user,
-            category_type_model=ContentType.objects.get_for_model(Category),
-            category_id=self.income_category.id,
+            user_category=self.income_category,
             amount=Decimal('100.00'),
             is_expense=False,
             notes="Bonus"
         )
 
-        url = reverse('transaction-list-create')
+        url = reverse('transaction-list')
         # Filter by expense
         response_expense = self.client.get(url + '?is_expense=true', format='json')
         self.assertEqual(response_expense.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response_expense.data), 1)
-        self.assertEqual(response_expense.data[0]['notes'], 'Weekly groceries')
+        self.assertEqual(len(response_expense.data['results']), 1)
+        self.assertEqual(response_expense.data['results'][0]['notes'], 'Weekly groceries')
 
         # Filter by income
         response_income = self.client.get(url + '?is_expense=false', format='json')
         self.assertEqual(response_income.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response_income.data), 2) # "Freelance work" and "Bonus"
+        self.assertEqual(len(response_income.data['results']), 2) # "Freelance work" and "Bonus"
+
+    def test_list_transactions_cursor_pagination(self):
+        """
+        Ensure the list is paginated by cursor and the `next` link walks every row once.
+        """
+        for i in range(5):
+            Transaction.objects.create(
+                user=self.user,
+                user_category=self.expense_category,
+                amount=Decimal('1.00'),
+                is_expense=True,
+                notes=f"Paged {i}"
+            )
+
+        url = reverse('transaction-list') + '?page_size=3'
+        seen = []
+        while url:
+            response = self.client.get(url, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 3)
+            seen.extend(t['id'] for t in response.data['results'])
+            url = response.data['next']
+
+        expected = list(Transaction.objects.filter(user=self.user).order_by('-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
 
 
     # --- Test Create Transactions ---
@@ -112,7 +141,7 @@ class TransactionAPITestCase(BaseAPITestCase):
         """
         Ensure we can create an expense transaction.
         """
-        url = reverse('transaction-list-create')
+        url = reverse('transaction-create')
         data = {
             'category_type_model': 'Category',
             'category_id': self.expense_category.pk,
@@ -124,6 +153,87 @@ class TransactionAPITestCase(BaseAPITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(Transaction.objects.filter(user=self.user).count(), 3) # Existing 2 + new 1
+        self.assertEqual(response.data['category_type_model'], 'category')
+        self.assertEqual(response.data['category_id'], self.expense_category.pk)
+
+    def test_create_transaction_with_default_category(self):
+        """
+        Ensure a default category is stored on the default_category foreign key.
+        """
+        default_category = DefaultCategory.objects.create(name="Travel", is_expense=True)
+        url = reverse('transaction-create')
+        data = {
+            'category_type_model': 'DefaultCategory',
+            'category_id': default_category.pk,
+            'amount': '80.00',
+            'is_expense': True,
+        }
+        response = self.client.post(url, data, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        transaction = Transaction.objects.get(pk=response.data['id'])
+        self.assertEqual(transaction.default_category, default_category)
+        self.assertIsNone(transaction.user_category)
+        self.assertEqual(response.data['category_type_model'], 'defaultcategory')
+
+    def test_create_with_default_category_skips_category_query(self):
+        """
+        Ensure default categories are resolved in memory once loaded.
+        """
+        default_category = DefaultCategory.objects.create(name="Travel", is_expense=True)
+        url = reverse('transaction-create')
+        data = {
+            'category_type_model': 'DefaultCategory',
+            'category_id': default_category.pk,
+            'amount': '10.00',
+            'is_expense': True,
+        }
+        self.client.post(url, data, format='json')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse(any('"api_defaultcategory"' in q['sql'] for q in queries.captured_queries))
+
+    def test_list_transactions_query_count(self):
+        """
+        Ensure categories are joined into the list query instead of fetched per row.
+        """
+        for i in range(5):
+            Transaction.objects.create(
+                user=self.user,
+                user_category=self.expense_category,
+                amount=Decimal('1.00'),
+                is_expense=True,
+            )
+        url = reverse('transaction-list')
+        # The user's data version, then the page
+        with self.assertNumQueries(2):
+            response = self.client.get(url, format='json')
+        self.assertEqual(len(response.data['results']), 7)
+
+    def test_list_transactions_expand_category(self):
+        """
+        Ensure `?expand=category` embeds the category without extra queries.
+        """
+        default_category = DefaultCategory.objects.create(name="Travel", is_expense=True, color="#F7DC6F")
+        Transaction.objects.create(
+            user=self.user,
+            default_category=default_category,
+            amount=Decimal('15.00'),
+            is_expense=True,
+        )
+        url = reverse('transaction-list') + '?expand=category'
+        with self.assertNumQueries(2):
+            response = self.client.get(url, format='json')
+
+        results = response.data['results']
+        self.assertEqual(results[0]['category']['name'], 'Travel')
+        self.assertEqual(results[0]['category']['color'], '#F7DC6F')
+        self.assertEqual(results[2]['category']['name'], 'Groceries')
+
+        response = self.client.get(reverse('transaction-list'), format='json')
+        self.assertNotIn('category', response.data['results'][0])
 
 
     # def test_create_income_transaction(self):
@@ -562,4 +672,300 @@ class TransactionAPITestCase(BaseAPITestCase):
     #     self.assertIn('error', response.data)
     #     self.assertIn('details', response.data['error'])
     #     self.assertIn("You do not have permission to perform this action.", response.data['error']['message'])
-    #     self.assertIn("You do not have permission to perform this action on this transaction.", response.data['error']['details']['detail'])
\ No newline at end of file
+    #     self.assertIn("You do not have permission to perform this action on this transaction.", response.data['error']['details']['detail'])
+    # --- Test Transaction Summary ---
+    def test_transaction_summary(self):
+        """
+        Ensure the summary totals only the user's active transactions.
+        """
+        self.transaction1.soft_delete()
+        Transaction.objects.create(
+            user=self.user,
+            user_category=self.expense_category,
+            amount=Decimal('30.25'),
+            is_expense=True,
+            notes="Snacks"
+        )
+
+        url = reverse('transaction-summary')
+        response = self.client.get(url, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_income'], '500.00')
+        self.assertEqual(response.data['total_expenses'], '30.25')
+        self.assertEqual(response.data['net_balance'], '469.75')
+        self.assertEqual(response.data['income_count'], 1)
+        self.assertEqual(response.data['expense_count'], 1)
+
+    def test_transaction_summary_with_filters(self):
+        """
+        Ensure the summary honours the same filters as the list.
+        """
+        url = reverse('transaction-summary')
+        response = self.client.get(url + '?search=groceries', format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_income'], '0.00')
+        self.assertEqual(response.data['total_expenses'], '50.00')
+        self.assertEqual(response.data['expense_count'], 1)
+
+    # --- Test Bulk Create ---
+    def test_bulk_create_transactions(self):
+        """
+        Ensure many transactions are created at once with a constant number of queries.
+        """
+        default_category = DefaultCategory.objects.create(name="Travel", is_expense=True)
+        rows = [
+            {'category_type_model': 'Category', 'category_id': self.expense_category.pk,
+             'amount': f'{i + 1}.00', 'is_expense': True, 'notes': f'Bulk {i}'}
+            for i in range(10)
+        ]
+        rows.append({'category_type_model': 'DefaultCategory', 'category_id': default_category.pk,
+                     'amount': '99.99', 'is_expense': True})
+
+        url = reverse('transaction-bulk-create')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, rows, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        statements = [q['sql'] for q in queries.captured_queries]
+        self.assertEqual(sum(sql.startswith('INSERT INTO "api_transaction" ') for sql in statements), 1)
+        self.assertEqual(sum('FROM "api_category"' in sql for sql in statements), 1)
+        self.assertLessEqual(sum('FROM "api_defaultcategory"' in sql for sql in statements), 1)
+        self.assertEqual(len(response.data), 11)
+        self.assertEqual(Transaction.objects.filter(user=self.user, notes__startswith='Bulk').count(), 10)
+        self.assertEqual(Transaction.objects.get(amount=Decimal('99.99')).default_category, default_category)
+        self.assertEqual(find_drift(), {}) # Rollups include the bulk inserted rows
+
+    def test_bulk_create_reports_errors_per_row(self):
+        """
+        Ensure nothing is written when a row is invalid and errors point at the row.
+        """
+        rows = [
+            {'category_type_model': 'Category', 'category_id': self.expense_category.pk,
+             'amount': '5.00', 'is_expense': True},
+            {'category_type_model': 'Category', 'category_id': self.other_category.pk,
+             'amount': '5.00', 'is_expense': True},
+            {'category_type_model': 'Category', 'category_id': self.expense_category.pk,
+             'amount': '-1.00', 'is_expense': True},
+        ]
+        url = reverse('transaction-bulk-create')
+        response = self.client.post(url, rows, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([e['index'] for e in response.data], [1, 2])
+        self.assertIn('category', response.data[0]['errors'])
+        self.assertIn('amount', response.data[1]['errors'])
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2)
+
+    # --- Test Export ---
+    def test_export_transactions_csv(self):
+        """
+        Ensure the CSV export streams a header and one line per active transaction.
+        """
+        url = reverse('transaction-export')
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,created_at,is_expense,amount,category_type_model,category_id,category_name,notes')
+        self.assertEqual(len(lines), 3)
+        self.assertIn('Groceries', lines[2])
+        self.assertNotIn("Other's expense", ''.join(lines))
+
+    def test_export_transactions_ndjson_with_filters(self):
+        """
+        Ensure the NDJSON export honours the list filters.
+        """
+        url = reverse('transaction-export') + '?output=ndjson&is_expense=false'
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        row = json.loads(lines[0])
+        self.assertEqual(row['notes'], 'Freelance work')
+        self.assertEqual(row['amount'], '500.00')
+        self.assertEqual(row['category_type_model'], 'category')
+
+    # --- Test Search ---
+    def test_search_matches_word_prefixes(self):
+        """
+        Ensure the `search` filter matches every word as a prefix, case-insensitively.
+        """
+        url = reverse('transaction-list')
+        response = self.client.get(url + '?search=groc WEEK', format='json')
+        self.assertEqual([t['notes'] for t in response.data['results']], ['Weekly groceries'])
+
+        response = self.client.get(url + '?search=groceries freelance', format='json')
+        self.assertEqual(response.data['results'], [])
+
+    def test_search_reflects_updated_notes(self):
+        """
+        Ensure the search index follows note changes and stays scoped to the user.
+        """
+        self.transaction2.notes = "Consulting invoice"
+        self.transaction2.save()
+        url = reverse('transaction-list')
+
+        response = self.client.get(url + '?search=consult', format='json')
+        self.assertEqual([t['id'] for t in response.data['results']], [self.transaction2.id])
+        response = self.client.get(url + '?search=freelance', format='json')
+        self.assertEqual(response.data['results'], [])
+        response = self.client.get(url + '?search=other', format='json')
+        self.assertEqual(response.data['results'], [])
+
+    def test_ranked_search(self):
+        """
+        Ensure the search endpoint orders matches by relevance.
+        """
+        best = Transaction.objects.create(
+            user=self.user,
+            user_category=self.expense_category,
+            amount=Decimal('9.00'),
+            is_expense=True,
+            notes="Groceries"
+        )
+        url = reverse('transaction-search')
+        response = self.client.get(url + '?q=groceries', format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([t['id'] for t in response.data], [best.id, self.transaction1.id])
+        self.assertGreater(response.data[0]['rank'], response.data[1]['rank'])
+
+    # --- Test Date Filters ---
+    def create_dated_transaction(self, created_at, notes):
+        return Transaction.objects.create(
+            user=self.user,
+            user_category=self.expense_category,
+            amount=Decimal('1.00'),
+            is_expense=True,
+            notes=notes,
+            created_at=created_at,
+        )
+
+    def test_date_filters_use_created_at_ranges(self):
+        """
+        Ensure year, month, day and from/to filters select the right rows with range conditions.
+        """
+        utc = timezone.get_fixed_timezone(0)
+        self.create_dated_transaction(timezone.datetime(2024, 12, 31, 23, 59, tzinfo=utc), "Dec")
+        self.create_dated_transaction(timezone.datetime(2025, 2, 1, 0, 0, tzinfo=utc), "Feb first")
+        self.create_dated_transaction(timezone.datetime(2025, 2, 28, 23, 59, tzinfo=utc), "Feb last")
+        self.create_dated_transaction(timezone.datetime(2025, 3, 1, 0, 0, tzinfo=utc), "Mar")
+        url = reverse('transaction-list')
+
+        def notes(query):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url + query, format='json')
+            self.assertNotIn('extract', queries.captured_queries[-1]['sql'].lower())
+            return sorted(t['notes'] for t in response.data['results'])
+
+        self.assertEqual(notes('?date=2024'), ['Dec'])
+        self.assertEqual(notes('?date=02-2025'), ['Feb first', 'Feb last'])
+        self.assertEqual(notes('?date=28-02-2025'), ['Feb last'])
+        self.assertEqual(notes('?date=2025-03-01'), ['Mar'])
+        self.assertEqual(notes('?from=2025-02-01&to=2025-03-01'), ['Feb first', 'Feb last', 'Mar'])
+        self.assertEqual(notes('?to=2024-12-31'), ['Dec'])
+
+    def test_date_filters_respect_time_zone(self):
+        """
+        Ensure the day boundaries follow the `tz` parameter.
+        """
+        utc = timezone.get_fixed_timezone(0)
+        # 03:00 UTC on March 1st is still February 28th in Bogota (UTC-5)
+        self.create_dated_transaction(timezone.datetime(2025, 3, 1, 3, 0, tzinfo=utc), "Late night")
+        url = reverse('transaction-list')
+
+        response = self.client.get(url + '?date=02-2025', format='json')
+        self.assertEqual(response.data['results'], [])
+        response = self.client.get(url + '?date=02-2025&tz=America/Bogota', format='json')
+        self.assertEqual([t['notes'] for t in response.data['results']], ['Late night'])
+
+    def test_dates_out_of_range_are_rejected(self):
+        """
+        Ensure dates whose bounds cannot be represented return a 400, not a 500.
+        """
+        for name, query in [
+            ('transaction-list', '?to=9999-12-31'),
+            ('transaction-list', '?date=9999'),
+            ('transaction-list', '?from=0001-01-01&tz=Asia/Tokyo'),
+            ('transaction-summary', '?to=9999-12-31'),
+            ('transaction-timeseries', '?interval=week&to=9999-12-31'),
+        ]:
+            with self.subTest(query=query):
+                response = self.client.get(reverse(name) + query, format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn('detail', response.data)
+
+        response = self.client.get(reverse('transaction-list') + '?to=9998-12-31', format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_invalid_category_id_is_rejected(self):
+        """
+        Ensure a category_id that is not a valid id returns a 400, not a 500.
+        """
+        for name in ('transaction-list', 'transaction-summary', 'transaction-export', 'transaction-timeseries'):
+            for value in ('abc', '0', '99999999999999999999'):
+                for query in (f'?category_id={value}&category_type_model=category&include_subcategories=true',
+                              f'?category_id={value}&category_type_model=defaultcategory'):
+                    with self.subTest(name=name, query=query):
+                        response = self.client.get(reverse(name) + query, format='json')
+                        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                        self.assertIn('detail', response.data)
+
+    # --- Test Timeseries ---
+    def test_timeseries_fills_empty_buckets(self):
+        """
+        Ensure the timeseries returns parallel arrays over every bucket of the window.
+        """
+        utc = timezone.get_fixed_timezone(0)
+        self.create_dated_transaction(timezone.datetime(2025, 1, 15, 12, 0, tzinfo=utc), "Jan")
+        self.create_dated_transaction(timezone.datetime(2025, 1, 20, 12, 0, tzinfo=utc), "Jan again")
+        self.create_dated_transaction(timezone.datetime(2025, 3, 2, 12, 0, tzinfo=utc), "Mar")
+        url = reverse('transaction-timeseries') + '?interval=month&from=2025-01-01&to=2025-04-30&is_expense=true'
+
+        response = self.client.get(url, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['buckets'], ['2025-01-01', '2025-02-01', '2025-03-01', '2025-04-01'])
+        self.assertEqual(len(response.data['series']), 1)
+        series = response.data['series'][0]
+        self.assertEqual((series['category_type_model'], series['category_id']), ('category', self.expense_category.id))
+        self.assertEqual(series['totals'], ['2.00', '0.00', '1.00', '0.00'])
+        self.assertEqual(series['counts'], [2, 0, 1, 0])
+
+    def test_timeseries_weeks_and_bounds(self):
+        """
+        Ensure weekly buckets start on Monday and oversized windows are rejected.
+        """
+        url = reverse('transaction-timeseries')
+        response = self.client.get(url + '?interval=week&from=2025-03-05&to=2025-03-17', format='json')
+        self.assertEqual(response.data['buckets'], ['2025-03-03', '2025-03-10', '2025-03-17'])
+
+        response = self.client.get(url + '?interval=day', format='json')
+        self.assertEqual(len(response.data['buckets']), 30)
+        self.assertEqual(response.data['buckets'][-1], self.today.isoformat())
+
+        response = self.client.get(url + '?interval=day&from=2020-01-01&to=2025-01-01', format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(url + '?interval=year', format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_timeseries_window_is_checked_before_building_buckets(self):
+        """
+        Ensure the bucket count matches the buckets, and huge windows are rejected without building them.
+        """
+        for interval in timeseries.INTERVALS:
+            for start, end in [(date(2024, 1, 31), date(2024, 3, 1)), (date(2024, 12, 29), date(2025, 1, 6)),
+                               (date(2025, 3, 3), date(2025, 3, 3))]:
+                with self.subTest(interval=interval, start=start, end=end):
+                    self.assertEqual(timeseries.bucket_count(interval, start, end),
+                                     len(timeseries.bucket_starts(interval, start, end)))
+
+        url = reverse('transaction-timeseries')
+        with mock.patch('api.timeseries.bucket_starts') as bucket_starts:
+            for interval in timeseries.INTERVALS:
+                response = self.client.get(url + f'?interval={interval}&from=0002-01-01&to=9998-12-31', format='json')
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        bucket_starts.assert_not_called()
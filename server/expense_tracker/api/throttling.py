@@ -0,0 +1,69 @@
+"""
+Token bucket throttles for the password endpoints.
+
+Every key (a login identifier, a client address) has a bucket holding up to
+N tokens for a rate of "N/period" in `DEFAULT_THROTTLE_RATES`, refilled
+continuously at that rate. Each request takes a token, so a short burst is
+allowed but the sustained rate is bounded. Buckets live in the "throttle"
+cache, a file or Redis cache shared by every worker (see `CACHES`), so the
+rate holds for the whole deployment and not per process. Two requests for
+the same key at the same instant may both read the same bucket and let one
+extra request through, which is fine for a throttle.
+"""
+
+import hashlib
+import math
+
+from django.core.cache import caches
+from django.utils.connection import ConnectionProxy
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    cache = ConnectionProxy(caches, 'throttle')
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        capacity, refill_per_second = self.num_requests, self.num_requests / self.duration
+        now = self.timer()
+        tokens, updated_at = self.cache.get(self.key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+        if tokens < 1:
+            self._wait = (1 - tokens) / refill_per_second
+            return False
+
+        # A bucket left alone until it is full again needs no entry
+        self.cache.set(self.key, (tokens - 1, now), math.ceil(self.duration))
+        return True
+
+    def wait(self):
+        return getattr(self, '_wait', None)
+
+
+class LoginRateThrottle(TokenBucketThrottle):
+    """
+    Limits login attempts per identifier (username or email, in any case).
+    """
+    scope = 'login'
+
+    def get_cache_key(self, request, view):
+        identifier = request.data.get('identifier')
+        if not isinstance(identifier, str) or not identifier:
+            return None
+        digest = hashlib.sha256(identifier.lower().encode()).hexdigest()
+        return self.cache_format % {'scope': self.scope, 'ident': digest}
+
+
+class RegisterRateThrottle(TokenBucketThrottle):
+    """
+    Limits registrations per client address.
+    """
+    scope = 'register'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
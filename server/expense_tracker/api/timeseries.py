@@ -0,0 +1,183 @@
+"""
+Bucketed transaction totals for charts.
+
+Transactions are grouped in SQL by `TruncDay`/`TruncWeek`/`TruncMonth` (in the
+requested time zone) and category, then laid out as parallel arrays over every
+bucket of the window, with the empty buckets filled with zeros. In the time
+zone of the rollups, the day or month rows of `TransactionRollup` are read
+instead (`build_rollup_timeseries()`), weeks being added up from days.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .date_ranges import add_months, filter_created_between, parse_day
+from .models import TransactionRollup
+from .totals import CENTS
+
+
+INTERVALS = {
+    # interval: (trunc function, default number of buckets, max number of buckets)
+    'day': (TruncDay, 30, 366),
+    'week': (TruncWeek, 12, 260),
+    'month': (TruncMonth, 12, 120),
+}
+
+
+def bucket_start(day, interval):
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    if interval == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(day, interval):
+    if interval == 'week':
+        return day + timedelta(weeks=1)
+    if interval == 'month':
+        return add_months(day, 1)
+    return day + timedelta(days=1)
+
+
+def bucket_count(interval, start, end):
+    """
+    Returns the number of buckets from `start` to `end` (inclusive), without
+    building them.
+    """
+    if interval == 'week':
+        return (bucket_start(end, interval) - bucket_start(start, interval)).days // 7 + 1
+    if interval == 'month':
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    return (end - start).days + 1
+
+
+def bucket_starts(interval, start, end):
+    """
+    Returns the first day of every bucket from `start` to `end` (inclusive).
+    """
+    buckets, day = [], bucket_start(start, interval)
+    while day <= end:
+        buckets.append(day)
+        day = next_bucket(day, interval)
+    return buckets
+
+
+def window(query_params, tz):
+    """
+    Returns `(interval, buckets)` for the `interval`, `from` and `to` query
+    parameters. Without `from`, the window covers the default number of
+    buckets up to `to` (today by default). Raises ValueError if a value is
+    invalid or the window has too many buckets.
+    """
+    interval = query_params.get('interval', 'day').lower()
+    if interval not in INTERVALS:
+        raise ValueError("Interval must be 'day', 'week' or 'month'.")
+    _, default_buckets, max_buckets = INTERVALS[interval]
+
+    end = parse_day(query_params['to']) if query_params.get('to') else timezone.localdate(timezone=tz)
+    if query_params.get('from'):
+        start = parse_day(query_params['from'])
+    else:
+        start = bucket_start(end, interval)
+        for _ in range(default_buckets - 1):
+            start = bucket_start(start - timedelta(days=1), interval)
+    if start > end:
+        raise ValueError("'from' must not be after 'to'.")
+
+    # Checked before building the buckets, a wide window would be costly to build
+    if bucket_count(interval, start, end) > max_buckets:
+        raise ValueError(f"The window has too many {interval} buckets (max {max_buckets}).")
+    return interval, bucket_starts(interval, start, end)
+
+
+def build_timeseries(queryset, interval, buckets, tz):
+    """
+    Returns the totals of `queryset` per bucket, category and type as
+    columnar data: one `buckets` array, and per series parallel `totals`
+    (strings, like `amount`) and `counts` arrays.
+    """
+    trunc = INTERVALS[interval][0]
+    queryset = filter_created_between(queryset, buckets[0], next_bucket(buckets[-1], interval), tz)
+    rows = (
+        queryset.order_by()
+        .annotate(bucket=trunc('created_at', tzinfo=tz))
+        .values('bucket', 'user_category_id', 'default_category_id', 'is_expense')
+        .annotate(total=Sum('amount'), count=Count('id'))
+    )
+
+    def entries():
+        for row in rows:
+            if row['user_category_id'] is not None:
+                category = ('category', row['user_category_id'])
+            elif row['default_category_id'] is not None:
+                category = ('defaultcategory', row['default_category_id'])
+            else:
+                category = (None, None)
+            day = timezone.localtime(row['bucket'], tz).date()
+            yield day, category + (row['is_expense'],), row['total'], row['count']
+
+    return _layout(entries(), interval, buckets)
+
+
+def build_rollup_timeseries(queryset, interval, buckets):
+    """
+    Same as `build_timeseries()`, from `TransactionRollup` rows in the
+    rollups' time zone: month rows for months, day rows otherwise.
+    """
+    granularity = TransactionRollup.MONTH if interval == 'month' else TransactionRollup.DAY
+    rows = (
+        queryset.filter(granularity=granularity, period__gte=buckets[0],
+                        period__lt=next_bucket(buckets[-1], interval))
+        # Rows left empty by deletes, which would show up as series of zeros
+        .exclude(count=0)
+        .order_by()
+        .values('period', 'category_type', 'category_id', 'is_expense')
+        # Both names are taken by fields of the rollup
+        .annotate(period_total=Sum('total'), period_count=Sum('count'))
+    )
+
+    def entries():
+        for row in rows:
+            # Uncategorized rows have an empty type and id 0
+            category = (row['category_type'], row['category_id']) if row['category_type'] else (None, None)
+            day = bucket_start(row['period'], interval)
+            yield day, category + (row['is_expense'],), row['period_total'], row['period_count']
+
+    return _layout(entries(), interval, buckets)
+
+
+def _layout(entries, interval, buckets):
+    """
+    Adds up `(bucket, (category_type, category_id, is_expense), total, count)`
+    entries into the columnar response.
+    """
+    index = {day: i for i, day in enumerate(buckets)}
+    series = {}
+    for day, key, total, count in entries:
+        if key not in series:
+            series[key] = ([Decimal('0.00')] * len(buckets), [0] * len(buckets))
+        i = index[day]
+        series[key][0][i] += total or Decimal('0.00')
+        series[key][1][i] += count
+
+    return {
+        'interval': interval,
+        'buckets': [day.isoformat() for day in buckets],
+        'series': [
+            {
+                'category_type_model': category_type,
+                'category_id': category_id,
+                'is_expense': is_expense,
+                'totals': [str(total.quantize(CENTS)) for total in totals],
+                'counts': counts,
+            }
+            for (category_type, category_id, is_expense), (totals, counts) in sorted(
+                series.items(), key=lambda item: (item[0][0] or '', item[0][1] or 0, item[0][2])
+            )
+        ],
+    }
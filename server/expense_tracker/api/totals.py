@@ -0,0 +1,63 @@
+"""
+Income/expense totals shared by the summary endpoints.
+"""
+
+from decimal import Decimal
+
+from django.db.models import Count, Sum
+
+from .models import TransactionRollup
+
+
+CENTS = Decimal('0.01')
+
+
+def grouped_totals(queryset, *fields):
+    """
+    Runs one grouped SUM/COUNT query over `queryset`, by `fields` and
+    `is_expense`. Returns a list of dicts with `total` and `count`.
+    `queryset` holds either transactions or `TransactionRollup` rows.
+    """
+    return [_row(row) for row in _grouped(queryset, fields)]
+
+
+def _grouped(queryset, fields):
+    if queryset.model is TransactionRollup:
+        # Rollup rows already hold totals and counts, under the names of the results
+        aggregates = {'rollup_total': Sum('total'), 'rollup_count': Sum('count')}
+    else:
+        aggregates = {'total': Sum('amount'), 'count': Count('id')}
+    return queryset.order_by().values(*fields, 'is_expense').annotate(**aggregates)
+
+
+def _row(row):
+    if 'rollup_total' in row:
+        row['total'], row['count'] = row.pop('rollup_total'), row.pop('rollup_count')
+    return row
+
+
+def summarize(rows):
+    """
+    Adds up rows from `grouped_totals()` into income, expense and net totals.
+    Amounts are returned as strings, like `amount` in TransactionSerializer.
+    """
+    totals = {True: Decimal('0.00'), False: Decimal('0.00')}
+    counts = {True: 0, False: 0}
+    for row in rows:
+        totals[row['is_expense']] += row['total'] or Decimal('0.00')
+        counts[row['is_expense']] += row['count']
+
+    return {
+        'total_income': str(totals[False].quantize(CENTS)),
+        'total_expenses': str(totals[True].quantize(CENTS)),
+        'net_balance': str((totals[False] - totals[True]).quantize(CENTS)),
+        'income_count': counts[False],
+        'expense_count': counts[True],
+    }
+
+
+async def agrouped_totals(queryset, *fields):
+    """
+    Same as `grouped_totals()`, with the async ORM.
+    """
+    return [_row(row) async for row in _grouped(queryset, fields)]
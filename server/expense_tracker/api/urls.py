@@ -1,8 +1,9 @@
 from django.urls import path
 from .views.authentication import RegisterUserView, LoginUserView, LogoutUserView, UserDetailView, CustomTokenRefreshView
-from .views.transaction import TransactionListAPIView, TransactionCreateAPIView, TransactionRetrieveUpdateDestroyAPIView
-from .views.category import CategoryListCreateAPIView, CategoryRetrieveUpdateDestroyAPIView
+from .views.transaction import TransactionListAPIView, TransactionCreateAPIView, TransactionRetrieveUpdateDestroyAPIView, TransactionSummaryAPIView, TransactionBulkCreateAPIView, TransactionExportAPIView, TransactionImportAPIView, TransactionSearchAPIView, TransactionTimeseriesAPIView
+from .views.category import CategoryListCreateAPIView, CategoryRetrieveUpdateDestroyAPIView, CategoryTotalsAPIView
 from .views.default_category import DefaultCategoryListView
+from .views.sync import SyncAPIView
 
 urlpatterns = [
     # --- Authentication & User Management URLs ---
@@ -15,12 +16,22 @@ urlpatterns = [
     # --- Transaction URLs ---
     path('transactions/', TransactionListAPIView.as_view(), name='transaction-list'),
     path('transactions/create/', TransactionCreateAPIView.as_view(), name='transaction-create'),
+    path('transactions/bulk/', TransactionBulkCreateAPIView.as_view(), name='transaction-bulk-create'),
+    path('transactions/export/', TransactionExportAPIView.as_view(), name='transaction-export'),
+    path('transactions/import/', TransactionImportAPIView.as_view(), name='transaction-import'),
+    path('transactions/search/', TransactionSearchAPIView.as_view(), name='transaction-search'),
+    path('transactions/summary/', TransactionSummaryAPIView.as_view(), name='transaction-summary'),
+    path('transactions/timeseries/', TransactionTimeseriesAPIView.as_view(), name='transaction-timeseries'),
     path('transactions/<int:pk>/', TransactionRetrieveUpdateDestroyAPIView.as_view(), name='transaction-detail'),
 
     # --- Category URLs ---
     path('categories/', CategoryListCreateAPIView.as_view(), name='category-list-create'),
     path('categories/<int:pk>/', CategoryRetrieveUpdateDestroyAPIView.as_view(), name='category-detail'),
+    path('categories/<int:pk>/totals/', CategoryTotalsAPIView.as_view(), name='category-totals'),
 
     # --- Default Categories URL
     path('categories/default/', DefaultCategoryListView.as_view(), name='category-default-list'),
+
+    # --- Delta sync URL
+    path('sync/', SyncAPIView.as_view(), name='sync'),
 ]
@@ -1,22 +1,32 @@
 from rest_framework import status
 from rest_framework.views import APIView
+from adrf.views import APIView as AsyncAPIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenRefreshView
 from rest_framework_simplejwt.exceptions import TokenError
 from django.contrib.auth.models import User
-from django.contrib.auth import authenticate
+from asgiref.sync import sync_to_async
+import logging
+from ..authentication import find_user
+from ..throttling import LoginRateThrottle, RegisterRateThrottle
+from .. import hashing
+
+logger = logging.getLogger(__name__)
 
 # --- User Authentication & Management Views ---
 
-class RegisterUserView(APIView):
+class RegisterUserView(AsyncAPIView):
     """
     Handles user registration. Creates a new User instance and returns JWT tokens.
+    The password is hashed in `api.hashing`'s pool, and registrations are
+    throttled per client address.
     """
     permission_classes = [AllowAny] # Allow anyone to register
+    throttle_classes = [RegisterRateThrottle]
 
-    def post(self, request):
+    async def post(self, request):
         username = request.data.get('username')
         password = request.data.get('password')
         email = request.data.get('email')
@@ -26,15 +36,23 @@ class RegisterUserView(APIView):
             return Response({'error': 'Username, password, and email are required'}, status=status.HTTP_400_BAD_REQUEST)
 
         # Check if username or email already exists
-        if User.objects.filter(username=username).exists():
+        if await User.objects.filter(username=username).aexists():
             return Response({'error': 'Username already exists'}, status=status.HTTP_400_BAD_REQUEST)
-        if User.objects.filter(email=email).exists():
+        if await User.objects.filter(email=email).aexists():
             return Response({'error': 'Email already exists'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Create user
+        # Outside any try: if the pool is full, HashingBusy answers with a 503
+        encoded_password = await hashing.amake_password(password)
+
+        # Create user (as User.objects.create_user, with the password already hashed)
         try:
-            user = User.objects.create_user(username=username, password=password, email=email)
-            refresh = RefreshToken.for_user(user)
+            user = User(
+                username=User.normalize_username(username),
+                email=User.objects.normalize_email(email),
+                password=encoded_password,
+            )
+            await user.asave()
+            refresh = await sync_to_async(RefreshToken.for_user)(user)
 
             return Response({
                 'access': str(refresh.access_token),
@@ -43,25 +61,25 @@ class RegisterUserView(APIView):
         except Exception as e:
             return Response({'error': f'Failed to register user: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-class LoginUserView(APIView):
+class LoginUserView(AsyncAPIView):
     """
     Handles user login. Authenticates user by username/email and password,
     then returns JWT access and refresh tokens.
+    The password is checked in `api.hashing`'s pool, and attempts are
+    throttled per identifier.
     """
     permission_classes = [AllowAny] # Allow unauthenticated users to log in
+    throttle_classes = [LoginRateThrottle]
 
-    def post(self, request):
+    async def post(self, request):
         identifier = request.data.get('identifier')  # Can be username or email
         password = request.data.get('password')
 
         if not identifier or not password:
             return Response({'error': 'Identifier (username/email) and password are required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Try to find user by email or username
-        user = (
-            User.objects.filter(email__iexact=identifier).first() # Case-insensitive email check
-            or User.objects.filter(username__iexact=identifier).first() # Case-insensitive username check
-        )
+        # Looks up the email or username (ignoring case) in a single query
+        user = await sync_to_async(find_user)(identifier)
 
         if not user:
             return Response(
@@ -69,17 +87,15 @@ class LoginUserView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Authenticate user using the found username (authenticate expects username)
-        authenticated_user = authenticate(request, username=user.username, password=password)
-        
-        if not authenticated_user:
+        # Same checks as ModelBackend, without looking the user up again
+        if not (await hashing.acheck_password(user, password) and user.is_active):
             return Response(
                 {'error': 'Invalid username/email or password'},
                 status=status.HTTP_401_UNAUTHORIZED
             )
 
         # Generate tokens
-        refresh = RefreshToken.for_user(authenticated_user)
+        refresh = await sync_to_async(RefreshToken.for_user)(user)
         return Response({
             'access': str(refresh.access_token),
             'refresh': str(refresh),
@@ -103,14 +119,14 @@ class LogoutUserView(APIView):
             return Response({"error": "Invalid token or token not provided."}, status=status.HTTP_400_BAD_REQUEST)
 
     
-class UserDetailView(APIView):
+class UserDetailView(AsyncAPIView):
     """
     Retrieves details of the currently authenticated user.
     Requires authentication.
     """
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
+    async def get(self, request):
         user = request.user 
         
         user_data = {
@@ -131,19 +147,19 @@ class CustomTokenRefreshView(TokenRefreshView):
             response = super().post(request, *args, **kwargs)
             return response
         except TokenError as e:
-            print(f"TokenError: {e.detail}")
+            logger.info("TokenError: %s", e.detail)
             return Response(
                 {"detail": e.detail},
                 status=status.HTTP_400_BAD_REQUEST
             )
         except User.DoesNotExist:
-            print("User associated with refresh token does not exist.")
+            logger.warning("User associated with refresh token does not exist.")
             return Response(
                 {"detail": "User associated with refresh token does not exist. Please log in again."},
                 status=status.HTTP_404_NOT_FOUND # O status.HTTP_400_BAD_REQUEST
             )
         except Exception as e:
-            print(f"Unexpected error during token refresh: {e}")
+            logger.exception("Unexpected error during token refresh")
             return Response(
                 {"detail": "An unexpected error occurred."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
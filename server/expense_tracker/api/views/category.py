@@ -1,16 +1,27 @@
-from rest_framework import generics
+from rest_framework import generics, mixins
+from adrf.generics import GenericAPIView as AsyncGenericAPIView
+from asgiref.sync import sync_to_async
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.exceptions import PermissionDenied
-from ..models import Category
+from rest_framework.exceptions import NotFound, PermissionDenied
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from ..models import Category, Transaction, TransactionRollup
 from ..serializers import CategorySerializer
+from ..category_tree import get_category_tree, subtree_sql
+from ..date_ranges import filter_by_date_params
+from ..filters import filter_rollup_dates
+from ..totals import grouped_totals, summarize
+from ..user_data import get_user_data_version, not_modified, set_validators, user_data_etag
 from django.db import models
 from rest_framework import serializers
 
 # --- Category CRUD Views ---
 
-class CategoryListCreateAPIView(generics.ListCreateAPIView):
+class CategoryListCreateAPIView(mixins.CreateModelMixin, AsyncGenericAPIView):
     """
     Handles listing all categories for the authenticated user and creating new categories.
+    The list is read with the async ORM, and validated with ETag and
+    Last-Modified (see `api.user_data`).
     """
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]
@@ -27,6 +38,19 @@ class CategoryListCreateAPIView(generics.ListCreateAPIView):
         """
         serializer.save(user=self.request.user)
 
+    async def get(self, request, *args, **kwargs):
+        version, last_modified = await sync_to_async(get_user_data_version)(request.user.id)
+        etag = user_data_etag(request, version)
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            categories = [category async for category in self.get_queryset()]
+            response = Response(self.get_serializer(categories, many=True).data)
+        return set_validators(response, etag, last_modified)
+
+    async def post(self, request, *args, **kwargs):
+        # Validation and saving stay synchronous
+        return await sync_to_async(self.create)(request, *args, **kwargs)
+
 
 class CategoryRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
     """
@@ -50,15 +74,64 @@ class CategoryRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView
     def perform_destroy(self, instance):
         """
         Performs the delete operation for a category.
-        Due to `on_delete=models.PROTECT` on Transaction, deleting a category with
-        associated transactions will raise a ProtectedError. This is desired behavior.
+        Due to `on_delete=models.RESTRICT` on Transaction, deleting a category with
+        associated transactions will raise a RestrictedError. This is desired behavior.
 
         Consider implementing soft delete for categories if desired,
-        to avoid ProtectedError directly.
+        to avoid RestrictedError directly.
         """
         try:
             instance.delete()
-        except models.ProtectedError as e: # Asegúrate de importar `models` de Django
+        except models.RestrictedError as e: # Asegúrate de importar `models` de Django
             raise serializers.ValidationError(
                 {"detail": f"Cannot delete category '{instance.name}' because it has associated transactions. Please reassign transactions first."}
-            ) from e
\ No newline at end of file
+            ) from e
+
+
+class CategoryTotalsAPIView(APIView):
+    """
+    Returns income, expense and net totals for a category together with all
+    its subcategories, plus the totals filed directly under each of them.
+    Accepts the `date`, `from`, `to` and `tz` filters of the transaction list.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        tree = get_category_tree(request.user.id, pk)
+        if pk not in tree:
+            raise NotFound("Category not found.")
+
+        # One query: the recursive CTE resolves the subtree inside the SUM,
+        # over the rollups unless the dates are in another time zone
+        field, queryset = 'category_id', filter_rollup_dates(
+            TransactionRollup.objects.filter(
+                user=request.user,
+                category_type='category',
+                category_id__in=subtree_sql(request.user.id, pk),
+            ),
+            request.query_params,
+        )
+        if queryset is None:
+            field, queryset = 'user_category_id', filter_by_date_params(
+                Transaction.objects.filter(
+                    user=request.user,
+                    deleted_at__isnull=True,
+                    user_category_id__in=subtree_sql(request.user.id, pk),
+                ),
+                request.query_params,
+            )
+        rows = grouped_totals(queryset, field)
+
+        by_category = {}
+        for row in rows:
+            by_category.setdefault(row[field], []).append(row)
+
+        return Response({
+            'category_id': pk,
+            'name': tree.name(pk),
+            **summarize(rows),
+            'categories': [
+                {'category_id': category_id, 'name': tree.name(category_id), **summarize(by_category.get(category_id, []))}
+                for category_id in tree.subtree_ids(pk)
+            ],
+        })
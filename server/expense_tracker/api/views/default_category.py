@@ -1,10 +1,37 @@
-from rest_framework import generics
+from rest_framework import generics, status
 from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
 from ..default_categories import DefaultCategory
 from ..serializers import DefaultCategorySerializer
+from ..caching import DEFAULT_CATEGORIES, etag_matches, get_or_build
+
+
+# With the per-process locmem backend, only the worker that handled a change
+# bumps the version, so other workers rebuild the list after this many seconds
+MAX_AGE = 300
+
 
 class DefaultCategoryListView(generics.ListAPIView):
+    """
+    Lists the active default categories. The serialized list is cached and
+    versioned (see `api.caching`); clients that send the current ETag in
+    If-None-Match get a 304 without a body. Entries expire after `MAX_AGE`
+    seconds.
+    """
     queryset = DefaultCategory.objects.filter(is_active=True)
     serializer_class = DefaultCategorySerializer
     permission_classes = [AllowAny]
-    pagination_class = None
\ No newline at end of file
+    pagination_class = None
+
+    def list(self, request, *args, **kwargs):
+        data, etag = get_or_build(
+            DEFAULT_CATEGORIES,
+            lambda: self.get_serializer(self.get_queryset(), many=True).data,
+            timeout=MAX_AGE,
+        )
+        if etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response['ETag'] = etag
+        return response
@@ -0,0 +1,19 @@
+import secrets
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+from ..metrics import registry
+
+
+def metrics_view(request):
+    """
+    Exposes the request metrics of this process in the Prometheus text format.
+    When `METRICS_TOKEN` is set, scrapers must send it as a bearer token.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        provided = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not secrets.compare_digest(provided, token):
+            return HttpResponseForbidden()
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,36 @@
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from ..serializers import CategorySerializer, TransactionSerializer
+from .. import sync
+
+
+class SyncAPIView(APIView):
+    """
+    Delta sync for offline clients. Returns the transactions and categories
+    created, updated or deleted after `since` (the `token` of the previous
+    response; omit it for a full snapshot), at most `limit` changes at a
+    time. While `has_more` is true, ask again with the new token.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            since = sync.parse_token(request.query_params.get('since'))
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', sync.DEFAULT_LIMIT)), 1), sync.MAX_LIMIT)
+        except ValueError:
+            limit = sync.DEFAULT_LIMIT
+
+        changes = sync.changes_since(request.user, since, limit)
+        context = {'request': request}
+        return Response({
+            'token': str(changes['token']),
+            'has_more': changes['has_more'],
+            'transactions': TransactionSerializer(changes['transactions'], many=True, context=context).data,
+            'categories': CategorySerializer(changes['categories'], many=True, context=context).data,
+            'deleted': changes['deleted'],
+        })
@@ -1,77 +1,232 @@
-from rest_framework import generics
+from rest_framework import generics, status
+from rest_framework.views import APIView
+from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import MultiPartParser
 from rest_framework.exceptions import PermissionDenied
-from ..models import Transaction
+from adrf.generics import GenericAPIView as AsyncGenericAPIView
+from adrf.views import APIView as AsyncAPIView
+from asgiref.sync import sync_to_async
+from django.db import transaction as db_transaction
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
+import csv
+from ..models import Category, ChangeCounter, Transaction, TransactionRollup
+from .. import rollups
+from ..importers import StatementError, import_statement, parser_for
 from ..serializers import TransactionSerializer
-from django.contrib.contenttypes.models import ContentType
-from ..renderer import CustomResponseRenderer
+from ..renderer import CustomResponseRenderer, dumps, loads
+from ..pagination import TransactionCursorPagination
+from ..filters import filter_rollups, filter_transactions
+from ..search import rank_transactions
+from ..totals import agrouped_totals, summarize
+from ..date_ranges import get_timezone
+from .. import timeseries
+from ..user_data import get_user_data_version, not_modified, set_validators, user_data_etag
+from ..response_cache import normalize_params, transaction_lists
 
 
-class TransactionListAPIView(generics.ListAPIView):
+class TransactionListAPIView(AsyncGenericAPIView):
     """
     Vista para listar transacciones.
+    The page is fetched with the async ORM. Responses carry ETag and
+    Last-Modified validators over the user's data (see `api.user_data`),
+    and repeated queries are served from `api.response_cache`.
     """
     serializer_class = TransactionSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = TransactionCursorPagination
+    query_budget = 4
     
     def get_queryset(self):
-        queryset = Transaction.objects.filter(user=self.request.user, deleted_at__isnull=True)
-
-        # Filter by expense type
-        is_expense = self.request.query_params.get('is_expense')
-        if is_expense is not None:
-            queryset = queryset.filter(is_expense=(is_expense.lower() == 'true'))
-
-        # Filter by category
-        category_id = self.request.query_params.get('category_id')
-        category_type = self.request.query_params.get('category_type_model') 
-        if category_id and category_type:
-            try:
-                content_type_obj = ContentType.objects.get(app_label='api', model=category_type.lower()) 
-                queryset = queryset.filter(category_type_model=content_type_obj, category_id=category_id)
-            except ContentType.DoesNotExist:
-                print("Something wrong in Transaction List by categories")
-                pass
-
-        # Filter by date
-        date_param = self.request.query_params.get('date')
-        if date_param:
-            try:
-                # Parse different date formats
-                if len(date_param) == 4:  # Year only (e.g., "2025")
-                    year = int(date_param)
-                    queryset = queryset.filter(created_at__year=year)
-                elif len(date_param) == 7 and '-' in date_param:  # Month-Year (e.g., "08-2025")
-                    month, year = date_param.split('-')
-                    queryset = queryset.filter(created_at__month=int(month), created_at__year=int(year))
-                elif len(date_param) == 10 and date_param.count('-') == 2:  # Full date (e.g., "15-08-2025" or "2025-08-15")
-                    # Handle both DD-MM-YYYY and YYYY-MM-DD formats
-                    parts = date_param.split('-')
-                    if len(parts[0]) == 4:  # YYYY-MM-DD format
-                        year, month, day = parts
-                    else:  # DD-MM-YYYY format
-                        day, month, year = parts
-                    queryset = queryset.filter(
-                        created_at__year=int(year),
-                        created_at__month=int(month), 
-                        created_at__day=int(day)
-                    )
-            except (ValueError, IndexError):
-                # Invalid date format, ignore filter
-                pass
-
-        # Filter by keywords in notes
-        search = self.request.query_params.get('search')
-        if search:
-            # Split search terms and filter by each word in notes
-            search_terms = search.strip().split()
-            for term in search_terms:
-                queryset = queryset.filter(notes__icontains=term)
-
+        queryset = (
+            Transaction.objects.filter(user=self.request.user, deleted_at__isnull=True)
+            .select_related('user_category', 'default_category')
+        )
+        queryset = filter_transactions(queryset, self.request.query_params, self.request.user)
         return queryset.order_by('-id')
     
     def get_serializer_context(self):
-        return {'request': self.request}
+        # `?expand=category` embeds the category; it is already joined by get_queryset
+        expand = self.request.query_params.get('expand', '')
+        return {'request': self.request, 'expand': {e.strip() for e in expand.split(',') if e.strip()}}
+
+    async def get(self, request, *args, **kwargs):
+        # If the user's data has not changed, answer 304 before building the queryset
+        version, last_modified = await sync_to_async(get_user_data_version)(request.user.id)
+        etag = user_data_etag(request, version)
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = await self.cached_response(request, version)
+        return set_validators(response, etag, last_modified)
+
+    async def cached_response(self, request, version):
+        """
+        Serves repeated queries from `api.response_cache`.
+        """
+        # The next/previous links include the host
+        key = (request.get_host(), normalize_params(request.query_params))
+        data = transaction_lists.get(request.user.id, version, key)
+        if data is not None:
+            return Response(data)
+
+        response = await self.build_response(request)
+        # A copy in plain types, holding no references to the serializer or the models
+        content = dumps(response.data)
+        transaction_lists.set(request.user.id, version, key, loads(content), len(content))
+        return response
+
+    async def build_response(self, request):
+        # The filters may read the category tree from the cache
+        queryset = await sync_to_async(self.get_queryset)()
+        page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        serializer = self.get_serializer(page, many=True)
+        return self.paginator.get_paginated_response(serializer.data)
+
+
+class TransactionSummaryAPIView(AsyncAPIView):
+    """
+    Returns income, expense and net totals for the authenticated user.
+    Accepts the same filters as the transaction list and computes everything
+    with a single grouped SUM/COUNT query, run with the async ORM. The query
+    reads the rollups (see `api.rollups`) unless the filters need the
+    transactions themselves.
+    """
+    permission_classes = [IsAuthenticated]
+    query_budget = 3
+
+    async def get(self, request):
+        queryset = await sync_to_async(filter_rollups)(
+            TransactionRollup.objects.filter(user=request.user), request.query_params, request.user
+        )
+        if queryset is None:
+            queryset = Transaction.objects.filter(user=request.user, deleted_at__isnull=True)
+            queryset = await sync_to_async(filter_transactions)(queryset, request.query_params, request.user)
+        return Response(summarize(await agrouped_totals(queryset)))
+
+
+class _Echo:
+    """
+    File-like object whose `write` hands the value back, so `csv.writer`
+    can format one row at a time for a streaming response.
+    """
+    def write(self, value):
+        return value
+
+
+class TransactionTimeseriesAPIView(APIView):
+    """
+    Returns daily, weekly or monthly totals per category for charts, as
+    parallel arrays over every bucket of a bounded window (`interval`,
+    `from`, `to`, `tz`). Accepts the other transaction list filters too.
+    Reads the rollups unless the filters need the transactions themselves.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        tz = get_timezone(request.query_params.get('tz'))
+        try:
+            interval, buckets = timeseries.window(request.query_params, tz)
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # build_timeseries applies the date window itself
+        params = request.query_params.copy()
+        for key in ('date', 'from', 'to'):
+            params.pop(key, None)
+        if rollups.in_rollup_zone(tz):
+            queryset = filter_rollups(TransactionRollup.objects.filter(user=request.user), params, request.user,
+                                      dates=False)
+            if queryset is not None:
+                return Response(timeseries.build_rollup_timeseries(queryset, interval, buckets))
+        queryset = Transaction.objects.filter(user=request.user, deleted_at__isnull=True)
+        queryset = filter_transactions(queryset, params, request.user)
+        return Response(timeseries.build_timeseries(queryset, interval, buckets, tz))
+
+
+class TransactionSearchAPIView(APIView):
+    """
+    Full-text search over the notes of the authenticated user's transactions.
+    Returns the `limit` best matches for `q`, most relevant first. The other
+    list filters can be combined with it.
+    """
+    permission_classes = [IsAuthenticated]
+    default_limit = 20
+    max_limit = 100
+
+    def get(self, request):
+        text = request.query_params.get('q', '')
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+
+        queryset = (
+            Transaction.objects.filter(user=request.user, deleted_at__isnull=True)
+            .select_related('user_category', 'default_category')
+        )
+        queryset = filter_transactions(queryset, request.query_params, request.user)
+        results = list(rank_transactions(queryset, text)[:max(limit, 0)])
+
+        data = TransactionSerializer(results, many=True, context={'request': request}).data
+        for row, txn in zip(data, results):
+            row['rank'] = txn.rank
+        return Response(data)
+
+
+class TransactionExportAPIView(APIView):
+    """
+    Streams the authenticated user's transactions as CSV (default) or NDJSON
+    (`?output=ndjson`). Accepts the same filters as the transaction list.
+    Rows are read through a server-side cursor and written as they arrive,
+    so memory stays flat whatever the size of the history.
+    """
+    permission_classes = [IsAuthenticated]
+    chunk_size = 2000
+    columns = ['id', 'created_at', 'is_expense', 'amount', 'category_type_model', 'category_id', 'category_name', 'notes']
+
+    def get(self, request):
+        output = request.query_params.get('output', 'csv').lower()
+        if output not in ('csv', 'ndjson'):
+            return Response({'detail': "Output must be 'csv' or 'ndjson'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = Transaction.objects.filter(user=request.user, deleted_at__isnull=True)
+        queryset = filter_transactions(queryset, request.query_params, request.user).order_by('-id')
+        rows = (
+            queryset
+            .annotate(category_name=Coalesce('user_category__name', 'default_category__name'))
+            .values_list('id', 'created_at', 'is_expense', 'amount', 'user_category_id',
+                         'default_category_id', 'category_name', 'notes')
+            .iterator(chunk_size=self.chunk_size)
+        )
+
+        if output == 'csv':
+            content, content_type = self.stream_csv(rows), 'text/csv'
+        else:
+            content, content_type = self.stream_ndjson(rows), 'application/x-ndjson'
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="transactions.{output}"'
+        return response
+
+    def export_rows(self, rows):
+        for txn_id, created_at, is_expense, amount, user_category_id, default_category_id, category_name, notes in rows:
+            if user_category_id is not None:
+                category_type, category_id = 'category', user_category_id
+            elif default_category_id is not None:
+                category_type, category_id = 'defaultcategory', default_category_id
+            else:
+                category_type, category_id = None, None
+            yield [txn_id, created_at.isoformat(), is_expense, amount, category_type, category_id, category_name, notes]
+
+    def stream_csv(self, rows):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(self.columns)
+        for row in self.export_rows(rows):
+            yield writer.writerow(row)
+
+    def stream_ndjson(self, rows):
+        for row in self.export_rows(rows):
+            yield dumps(dict(zip(self.columns, row))) + b'\n'
 
 
 class TransactionCreateAPIView(generics.CreateAPIView):
@@ -86,6 +241,95 @@ class TransactionCreateAPIView(generics.CreateAPIView):
         serializer.save(user=self.request.user)
 
 
+class TransactionBulkCreateAPIView(APIView):
+    """
+    Creates many transactions in one request. The body is a list of objects
+    in the same shape accepted by `transactions/create/`. Every row is
+    validated first and nothing is written unless all of them are valid;
+    errors are reported per row index.
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [CustomResponseRenderer]
+    max_rows = 1000
+    query_budget = None
+    query_repeat_limit = None
+
+    def post(self, request):
+        rows = request.data
+        if not isinstance(rows, list) or not rows:
+            return Response({'detail': 'Expected a non-empty list of transactions.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > self.max_rows:
+            return Response({'detail': f'At most {self.max_rows} transactions can be created at once.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        context = {'request': request, 'categories': self.preload_categories(rows)}
+        valid, errors = [], []
+        for index, row in enumerate(rows):
+            serializer = TransactionSerializer(data=row, context=context)
+            if serializer.is_valid():
+                valid.append(serializer)
+            else:
+                errors.append({'index': index, 'errors': serializer.errors})
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # bulk_create skips Transaction.save() and its signals, so the rollups
+        # are updated here; the serializer already enforces a positive amount
+        transactions = [Transaction(user=request.user, **s.validated_data) for s in valid]
+        with db_transaction.atomic():
+            ChangeCounter.stamp(transactions)
+            created = Transaction.objects.bulk_create(transactions)
+            rollups.record_bulk_create(created)
+
+        return Response(TransactionSerializer(created, many=True).data, status=status.HTTP_201_CREATED)
+
+    def preload_categories(self, rows):
+        """
+        Loads every user category referenced by `rows` with one query. Default
+        categories come from the in-process resolver.
+        """
+        ids = set()
+        for row in rows:
+            if not isinstance(row, dict) or str(row.get('category_type_model') or '').capitalize() != 'Category':
+                continue
+            try:
+                ids.add(int(row.get('category_id')))
+            except (TypeError, ValueError):
+                continue
+
+        return {
+            'Category': Category.objects.filter(user=self.request.user).in_bulk(ids) if ids else {},
+        }
+
+
+class TransactionImportAPIView(APIView):
+    """
+    Imports a CSV or OFX bank statement uploaded as `file`. The format is taken
+    from the file extension unless `statement_format` is given. Rows that were
+    already imported are skipped. A statement with an error imports nothing.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+    renderer_classes = [CustomResponseRenderer]
+    query_budget = None
+    query_repeat_limit = None
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': ['A statement file is required.']}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            parse = parser_for(upload.name, request.data.get('statement_format'))
+            # All or nothing: an error in a later row must not leave the earlier batches behind
+            with db_transaction.atomic():
+                stats = import_statement(request.user, parse(upload.file))
+        except (StatementError, UnicodeDecodeError) as e:
+            return Response({'file': [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(stats, status=status.HTTP_201_CREATED)
+
+
 class TransactionRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Transaction.objects.all()
     serializer_class = TransactionSerializer
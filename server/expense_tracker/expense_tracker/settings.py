@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from pathlib import Path
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -51,6 +52,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.middleware.MetricsMiddleware",
+    "api.query_guard.QueryBudgetMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -98,11 +101,71 @@ DATABASES = {
 
 # Caching
 # https://docs.djangoproject.com/en/5.1/topics/cache/
+# CACHE_BACKEND picks where cached data lives: "locmem" (per process, the
+# default), "file" (shared by the workers of one host) or "redis" (shared by
+# every host, CACHE_LOCATION is then the Redis URL). A write only invalidates
+# the locmem cache of the worker that handled it, so deployments with more
+# than one worker or host need "file" or "redis".
+CACHE_BACKENDS = {
+    'locmem': ("django.core.cache.backends.locmem.LocMemCache", "unique-snowflake"),
+    'file': ("django.core.cache.backends.filebased.FileBasedCache", str(BASE_DIR / ".cache")),
+    'redis': ("django.core.cache.backends.redis.RedisCache", "redis://127.0.0.1:6379/1"),
+}
+_cache = config('CACHE_BACKEND', default='locmem')
+_cache_backend, _cache_location = CACHE_BACKENDS[_cache]
+
+# Throttle buckets (see api/throttling.py) must be seen by every worker, or
+# each one would allow the full rate. THROTTLE_CACHE_BACKEND is "file" or
+# "redis" and defaults to CACHE_BACKEND, or to "file" when that is "locmem".
+THROTTLE_CACHE_BACKENDS = {
+    'file': ("django.core.cache.backends.filebased.FileBasedCache", str(BASE_DIR / ".throttle-cache")),
+    'redis': CACHE_BACKENDS['redis'],
+}
+_throttle_cache = config('THROTTLE_CACHE_BACKEND', default='file' if _cache == 'locmem' else _cache)
+if _throttle_cache not in THROTTLE_CACHE_BACKENDS:
+    raise ImproperlyConfigured('THROTTLE_CACHE_BACKEND must be "file" or "redis".')
+_throttle_cache_backend, _throttle_cache_location = THROTTLE_CACHE_BACKENDS[_throttle_cache]
+if _throttle_cache == 'redis':
+    # The same Redis as the default cache unless told otherwise
+    _throttle_cache_location = config('CACHE_LOCATION', default=_throttle_cache_location)
+
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        "LOCATION": "unique-snowflake", 
-    }
+        "BACKEND": _cache_backend,
+        "LOCATION": config('CACHE_LOCATION', default=_cache_location),
+    },
+    "throttle": {
+        "BACKEND": _throttle_cache_backend,
+        "LOCATION": config('THROTTLE_CACHE_LOCATION', default=_throttle_cache_location),
+    },
+}
+
+
+# Request metrics, served at /metrics (see api/metrics.py). METRICS_SAMPLE_RATE
+# is the fraction of requests that also record queries, DB time and render
+# time and get a Server-Timing header. Set METRICS_TOKEN to require it as a
+# bearer token when scraping.
+METRICS_SAMPLE_RATE = config('METRICS_SAMPLE_RATE', default=0.1, cast=float)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Per-view query budgets (see api/query_guard.py): "raise", "warn" or "off".
+# The tests always run with "raise"; "warn" logs N+1 patterns in development.
+QUERY_BUDGET_MODE = config('QUERY_BUDGET_MODE', default='off')
+
+# In-process cache of transaction list responses (see api/response_cache.py):
+# total size per worker, and entries kept per user.
+TRANSACTION_CACHE_MAX_BYTES = config('TRANSACTION_CACHE_MAX_BYTES', default=32 * 1024 * 1024, cast=int)
+TRANSACTION_CACHE_USER_ENTRIES = config('TRANSACTION_CACHE_USER_ENTRIES', default=64, cast=int)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "api": {"handlers": ["console"], "level": config('LOG_LEVEL', default='INFO')},
+    },
 }
 
 
@@ -156,12 +219,31 @@ CORS_ALLOWED_ORIGINS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication with a short-lived user cache, see api/authentication.py
+        'api.authentication.CachedJWTAuthentication',
     ),
+    # orjson-backed JSON renderer, see api/renderer.py
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderer.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    # Token buckets for the password endpoints, see api/throttling.py
+    'DEFAULT_THROTTLE_RATES': {
+        'login': config('LOGIN_RATE', default='10/min'),
+        'register': config('REGISTER_RATE', default='5/min'),
+    },
 }
 
 from datetime import timedelta
 
+# Password hashing pool for login and registration (see api/hashing.py):
+# hashes run at once per process, and how many more may wait before 503s.
+PASSWORD_HASHING_WORKERS = config('PASSWORD_HASHING_WORKERS', default=2, cast=int)
+PASSWORD_HASHING_QUEUE = config('PASSWORD_HASHING_QUEUE', default=16, cast=int)
+
+# Seconds a JWT-authenticated user is cached (0 disables it)
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=60, cast=int)
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),  # Token lifetime
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),  # Refresh token lifetime
@@ -0,0 +1,35 @@
+"""
+Production server settings: gunicorn managing uvicorn workers, which serve
+`expense_tracker.asgi`. Each worker runs an event loop, so the async views
+hold slow clients without tying up a thread per request.
+
+    gunicorn -c gunicorn.conf.py
+
+Every setting can be overridden from the environment.
+"""
+
+import multiprocessing
+import os
+
+from decouple import config
+
+wsgi_app = 'expense_tracker.asgi:application'
+worker_class = 'uvicorn_worker.UvicornWorker'
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+# The locmem cache is private to each worker, so writes would only invalidate
+# the cache of the worker that handled them. Several workers by default only
+# with a shared CACHE_BACKEND (see settings.py).
+shared_cache = config('CACHE_BACKEND', default='locmem') in ('file', 'redis')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1 if shared_cache else 1))
+
+# Restarts workers now and then to cap memory growth
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+reload = os.environ.get('GUNICORN_RELOAD', '').lower() in ('1', 'true', 'yes')
+accesslog = '-'
+errorlog = '-'